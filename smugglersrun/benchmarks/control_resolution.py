@@ -0,0 +1,76 @@
+"""
+Per-component vs batched resolution of the Player's controls.
+
+Each frame turns the pressed controls into the controls in effect, after
+every component's malfunction noise is compared with its damage. The
+per-component version is the one Player used before Components.
+
+Run from the smugglersrun directory:
+
+    PYTHONPATH=src python benchmarks/control_resolution.py
+"""
+from itertools import product
+from random import Random
+from time import perf_counter
+
+from smugglersrun.sandbox import Components
+from smugglersrun.systems import CONTROL_NAMES, Controls
+
+FRAMES = 20000
+TIME_DELTA = 0.016
+
+
+def control_active(factory, damage, control_val, now):
+    _random = (factory(now / Components.CONFIG_NOISE_PERIOD) + 1) / 2
+    malfunction = _random < damage / Components.CONFIG_MAX_DAMAGE
+    return (control_val and not malfunction) or (not control_val and malfunction)
+
+
+def frames(input_changes):
+    """
+    A frame time and Controls per frame, with the controls changing every
+    ``input_changes`` frames like a held key.
+    """
+    rng = Random(0)
+    controls = None
+    for frame in range(FRAMES):
+        if frame % input_changes == 0:
+            controls = Controls(*(rng.random() < 0.5 for _ in CONTROL_NAMES))
+        yield frame * TIME_DELTA, controls
+
+
+def bench(damage, input_changes):
+    components = Components(damage)
+    inputs = list(frames(input_changes))
+    for factory in components.noise.factories:  # Generate the gradients outside the timings.
+        factory.batch([now / Components.CONFIG_NOISE_PERIOD for now, _ in inputs])
+
+    pairs = list(zip(components.noise.factories, CONTROL_NAMES, components.damage.tolist()))
+    start = perf_counter()
+    scalar = [
+        [control_active(factory, damage, getattr(controls, name), now) for factory, name, damage in pairs]
+        for now, controls in inputs
+    ]
+    scalar_time = perf_counter() - start
+
+    start = perf_counter()
+    batch = [components.resolve(controls, now) for now, controls in inputs]
+    batch_time = perf_counter() - start
+
+    assert batch == scalar
+    return scalar_time, batch_time
+
+
+def main():
+    print(f"{FRAMES} frames per run")
+    print(f"{'damage':>6} {'held':>5} {'per-component us/frame':>23} {'batched us/frame':>17} {'speedup':>8}")
+    for damage, input_changes in product((0, 25, 75), (1, 30)):
+        scalar_time, batch_time = bench(damage, input_changes)
+        print(
+            f"{damage:>6} {input_changes:>5} {scalar_time / FRAMES * 1e6:>23.2f} "
+            f"{batch_time / FRAMES * 1e6:>17.2f} {scalar_time / batch_time:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
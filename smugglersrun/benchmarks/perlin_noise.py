@@ -0,0 +1,53 @@
+"""
+Scalar vs batch PerlinNoiseFactory evaluation across dimensions and octaves.
+
+Run from the smugglersrun directory:
+
+    PYTHONPATH=src python benchmarks/perlin_noise.py
+"""
+from itertools import product
+from time import perf_counter
+
+import numpy as np
+from ppb import assetlib
+
+from smugglersrun.perlin import PerlinNoiseFactory
+
+POINTS = 5000
+
+
+def bench(dimension, octaves):
+    points = np.random.default_rng(0).uniform(-50, 50, size=(POINTS, dimension))
+    scalar_points = points.tolist()
+
+    factory = PerlinNoiseFactory(dimension, octaves=octaves, cache_size=10 ** 6)
+    factory.batch(points)  # Generate the gradients outside the timings.
+
+    start = perf_counter()
+    scalar = [factory(*point) for point in scalar_points]
+    scalar_time = perf_counter() - start
+
+    start = perf_counter()
+    batch = factory.batch(points)
+    batch_time = perf_counter() - start
+
+    assert np.array_equal(batch, scalar)
+    return scalar_time, batch_time
+
+
+def main():
+    print(f"{POINTS} points per run")
+    print(f"{'dims':>4} {'octaves':>7} {'scalar us/pt':>13} {'batch us/pt':>12} {'speedup':>8}")
+    for dimension, octaves in product((1, 2, 3), (1, 2, 4)):
+        scalar_time, batch_time = bench(dimension, octaves)
+        print(
+            f"{dimension:>4} {octaves:>7} {scalar_time / POINTS * 1e6:>13.2f} "
+            f"{batch_time / POINTS * 1e6:>12.2f} {scalar_time / batch_time:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    # Importing smugglersrun queues ppb asset loads; the process can only exit
+    # cleanly once the asset executor has run and been shut down.
+    with assetlib._executor:
+        main()
@@ -0,0 +1,62 @@
+"""
+Per-frame cost of drawing the race timer: ppb.Text vs the glyph atlas.
+
+Run from the smugglersrun directory:
+
+    PYTHONPATH=src python benchmarks/text_rendering.py
+"""
+import os
+from time import perf_counter
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from ppb import Text, assetlib
+from ppb.systems._sdl_utils import ttf_call
+from sdl2.sdlttf import TTF_Init, TTF_Quit
+
+from smugglersrun import font
+from smugglersrun.glyphs import AtlasTextMixin
+
+FRAMES = 2000
+
+
+def timer_string(frame):
+    time = 300 - frame / 60
+    return f"{time // 60:02.0f}:{int(time % 60):02d}:{(time % 1) * 100:02.0f}"
+
+
+class Timer(AtlasTextMixin):
+    atlas = font.button_atlas
+
+
+def bench_text():
+    start = perf_counter()
+    for frame in range(FRAMES):
+        Text(timer_string(frame), font=font.button, color=font.color).load()
+    return (perf_counter() - start) / FRAMES
+
+
+def bench_atlas(strings):
+    timer = Timer()
+    start = perf_counter()
+    for frame in range(FRAMES):
+        timer.text_image(strings(frame)).load()
+    return (perf_counter() - start) / FRAMES
+
+
+def main():
+    ttf_call(TTF_Init, _check_error=lambda rv: rv == -1)
+    with assetlib._executor:
+        font.button_atlas.load()
+        text = bench_text()
+        atlas = bench_atlas(timer_string)
+        unchanged = bench_atlas(lambda frame: timer_string(0))
+    ttf_call(TTF_Quit)
+
+    print(f"ppb.Text every frame:        {text * 1e6:8.1f} us/frame")
+    print(f"atlas, string changes:       {atlas * 1e6:8.1f} us/frame ({text / atlas:.1f}x)")
+    print(f"atlas, string unchanged:     {unchanged * 1e6:8.1f} us/frame ({text / unchanged:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
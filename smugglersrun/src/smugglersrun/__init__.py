@@ -1 +1,5 @@
+from time import perf_counter
+
+started = perf_counter()
+
 from smugglersrun import menu
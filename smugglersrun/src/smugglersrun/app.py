@@ -1,24 +1,35 @@
 """
 A space race game for the GMTK Gamejam 2020
 """
+import os
+
 import ppb
 from ppb import assetlib
 
 from smugglersrun import menu
+from smugglersrun.replay import Recorder
 from smugglersrun.splash import Splash
-from smugglersrun.systems import Controller, BackgroundMusicController
+from smugglersrun.systems import AtlasRenderer, Controller, BackgroundMusicController, FixedUpdater, FrameClock, HitchMonitor, Prefetcher, Profiler
 
 
 def main():
+    systems = [FrameClock, Controller, HitchMonitor, Prefetcher]
+    if os.environ.get("SMUGGLERSRUN_PROFILE"):
+        systems.append(Profiler)
+    record_path = os.environ.get("SMUGGLERSRUN_RECORD")
+    if record_path:
+        systems.append(Recorder)
     ppb.run(
         starting_scene=Splash,
         scene_kwargs={"next_scene": menu.Menu, "package": "smugglersrun"},
         title='Smuggler\'s Run',
         resolution=(1280, 720),
-        systems=[Controller],
+        systems=systems,
+        record_path=record_path,
+        profile_trace=os.environ.get("SMUGGLERSRUN_TRACE"),
         basic_systems=(
-            ppb.systems.Renderer,
-            ppb.systems.Updater,
+            FixedUpdater,
+            AtlasRenderer,
             ppb.systems.EventPoller,
             BackgroundMusicController,
             assetlib.AssetLoadingSystem
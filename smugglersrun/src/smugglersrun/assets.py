@@ -0,0 +1,87 @@
+"""
+The game's shared assets, loaded lazily and in priority order.
+
+ppb assets start loading as soon as they're constructed, so assets built at
+import time all load at once, ahead of the splash screen's own. Shared assets
+are declared in the :data:`manifest` instead, under the group of the scene
+that first needs them. A declared asset isn't constructed until it's first
+used or its group is prefetched; :class:`smugglersrun.systems.Prefetcher`
+prefetches every group, in priority order, once the first scene has started.
+The splash screen builds its own assets, so they're queued ahead of all of
+these.
+"""
+from typing import Dict, Iterable, List
+
+from ppb.assetlib import AbstractAsset
+
+MENU = "menu"
+SANDBOX = "sandbox"
+
+
+class LazyAsset(AbstractAsset):
+    """
+    Stands in for ``factory(*args, **kwargs)`` until it's first used.
+
+    Loading, or reading any attribute the stand-in doesn't have, constructs
+    the real asset, which starts it loading.
+    """
+    _asset = None
+
+    def __init__(self, factory, *args, **kwargs):
+        self.factory = factory
+        self.args = args
+        self.kwargs = kwargs
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self._asset if self._asset is not None else self.factory.__name__ + repr(self.args)} at 0x{id(self):x}>"
+
+    def __getattr__(self, name):
+        return getattr(self.asset, name)
+
+    @property
+    def asset(self):
+        if self._asset is None:
+            self._asset = self.factory(*self.args, **self.kwargs)
+        return self._asset
+
+    def prefetch(self):
+        self.asset
+
+    def load(self, timeout: float = None):
+        return self.asset.load(timeout)
+
+    def is_loaded(self):
+        return self._asset is not None and self._asset.is_loaded()
+
+
+class Manifest:
+    """
+    Assets by group, with groups in priority order.
+
+    Anything with a ``prefetch()`` method can be added; :meth:`lazy`
+    declares a :class:`LazyAsset`.
+    """
+
+    def __init__(self, priorities: Iterable[str]):
+        self.priorities = list(priorities)
+        self.groups: Dict[str, List] = {group: [] for group in self.priorities}
+
+    def add(self, group: str, asset):
+        self.groups[group].append(asset)
+        return asset
+
+    def lazy(self, group: str, factory, *args, **kwargs) -> LazyAsset:
+        return self.add(group, LazyAsset(factory, *args, **kwargs))
+
+    def prefetch(self, *groups: str):
+        """
+        Start loading the given groups, or every group, in priority order.
+        """
+        for group in self.priorities:
+            if groups and group not in groups:
+                continue
+            for asset in self.groups[group]:
+                asset.prefetch()
+
+
+manifest = Manifest([MENU, SANDBOX])
@@ -0,0 +1,93 @@
+"""
+Sprite images packed into one texture.
+
+``resources/atlas.png`` and its region index ``resources/atlas.json`` are
+built by ``tools/pack_atlas.py``. An :class:`Atlas` reads the index and hands
+out :class:`AtlasRegion` images, which all load as the one atlas surface.
+They must be drawn by :class:`smugglersrun.systems.AtlasRenderer`, which
+copies just the region.
+"""
+import json
+from pathlib import Path
+from typing import Dict, Tuple
+
+import ppb
+from ppb import vfs
+from ppb.assetlib import AbstractAsset
+from sdl2 import SDL_Rect
+
+Region = Tuple[int, int, int, int]
+
+
+class AtlasRegion(AbstractAsset):
+    """
+    One image in an atlas.
+
+    Loads as the whole atlas surface; ``region`` is the rectangle of that
+    surface holding this image.
+    """
+
+    def __init__(self, atlas: 'Atlas', name: str):
+        self.atlas = atlas
+        self.name = name
+
+    def __repr__(self):
+        return f"<{type(self).__name__} name={self.name!r} atlas={self.atlas.index!r} at 0x{id(self):x}>"
+
+    @property
+    def image(self) -> ppb.Image:
+        return self.atlas.image
+
+    @property
+    def region(self) -> SDL_Rect:
+        return self.atlas.regions[self.name]
+
+    def load(self, timeout: float = None):
+        return self.image.load(timeout)
+
+    def is_loaded(self):
+        return self.atlas.is_loaded()
+
+
+class Atlas:
+    """
+    The regions of an atlas, from its index file.
+
+    Nothing is read or loaded until a region is first loaded or the atlas is
+    prefetched, so regions can be handed out at import time.
+    """
+
+    def __init__(self, index: str):
+        self.index = index
+        self._image = None
+        self._regions = None
+
+    def _read_index(self):
+        with vfs.open(self.index) as index_file:
+            data = json.load(index_file)
+        self._regions = {
+            name: SDL_Rect(*region)
+            for name, region in data["regions"].items()
+        }
+        self._image = ppb.Image(str(Path(self.index).parent / data["image"]))
+
+    @property
+    def image(self) -> ppb.Image:
+        if self._image is None:
+            self._read_index()
+        return self._image
+
+    @property
+    def regions(self) -> Dict[str, SDL_Rect]:
+        if self._regions is None:
+            self._read_index()
+        return self._regions
+
+    def region(self, name: str) -> AtlasRegion:
+        return AtlasRegion(self, name)
+
+    def prefetch(self):
+        self.image
+
+    def is_loaded(self):
+        return self._image is not None and self._image.is_loaded()
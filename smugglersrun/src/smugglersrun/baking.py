@@ -0,0 +1,95 @@
+"""
+Static sprites baked into a single image.
+
+Sprites that never move or change, like the track's beacons, don't need to be
+drawn one at a time. A BakedImage copies an image to each of a set of offsets
+in one surface, once, so the whole group is a single texture and a single
+draw.
+"""
+import ctypes
+from typing import Iterable, Tuple
+
+from ppb import Vector
+from ppb.assetlib import AbstractAsset, ChainingMixin, FreeingMixin
+from ppb.systems._sdl_utils import sdl_call
+from sdl2 import SDL_BLENDMODE_BLEND
+from sdl2 import SDL_BLENDMODE_NONE
+from sdl2 import SDL_BlitSurface
+from sdl2 import SDL_ConvertSurfaceFormat
+from sdl2 import SDL_CreateRGBSurfaceWithFormat
+from sdl2 import SDL_FreeSurface
+from sdl2 import SDL_PIXELFORMAT_ARGB8888
+from sdl2 import SDL_Rect
+from sdl2 import SDL_SetSurfaceBlendMode
+
+
+class BakedImage(ChainingMixin, FreeingMixin, AbstractAsset):
+    """
+    Copies of ``image`` centered on each of ``offsets``, in game units.
+
+    Each copy is ``size`` units across, as a sprite of that size would be.
+    ``width``, ``height`` and ``center`` give the box the copies fill, in the
+    same units, so a RectangleSprite of that width and height placed at the
+    offsets' origin plus ``center`` draws every copy where it belongs. The
+    image keeps its own resolution, so it looks the same as the sprites it
+    replaces. ``image`` may be an AtlasRegion, in which case only its region
+    is copied.
+    """
+
+    def __init__(self, image, offsets: Iterable[Tuple[float, float]], *, size: float):
+        self.image = image
+        self.offsets = tuple(offsets)
+        self.size = size
+
+        half = size / 2
+        left = min(x for x, _ in self.offsets) - half
+        right = max(x for x, _ in self.offsets) + half
+        bottom = min(y for _, y in self.offsets) - half
+        top = max(y for _, y in self.offsets) + half
+        self.left = left
+        self.top = top
+        self.width = right - left
+        self.height = top - bottom
+        self.center = Vector((left + right) / 2, (bottom + top) / 2)
+
+        self._start(self.image)
+
+    def __repr__(self):
+        return f"<{type(self).__name__} image={self.image!r} copies={len(self.offsets)}{' loaded' if self.is_loaded() else ''} at 0x{id(self):x}>"
+
+    def _background(self):
+        # A private copy, so the shared image's blend mode is left alone.
+        source = sdl_call(
+            SDL_ConvertSurfaceFormat, self.image.load(), SDL_PIXELFORMAT_ARGB8888, 0,
+            _check_error=lambda rv: not rv
+        )
+        region = getattr(self.image, "region", None)
+        if region is None:
+            w, h = source.contents.w, source.contents.h
+        else:
+            w, h = region.w, region.h
+        pixels_per_unit = max(w, h) / self.size
+
+        baked = sdl_call(
+            SDL_CreateRGBSurfaceWithFormat, 0,
+            round(self.width * pixels_per_unit), round(self.height * pixels_per_unit),
+            32, SDL_PIXELFORMAT_ARGB8888,
+            _check_error=lambda rv: not rv
+        )
+        # Copy the image's alpha instead of blending onto the empty surface.
+        sdl_call(SDL_SetSurfaceBlendMode, source, SDL_BLENDMODE_NONE, _check_error=lambda rv: rv < 0)
+        for x, y in self.offsets:
+            center_x = (x - self.left) * pixels_per_unit
+            center_y = (self.top - y) * pixels_per_unit
+            sdl_call(
+                SDL_BlitSurface, source, None if region is None else ctypes.byref(region), baked,
+                ctypes.byref(SDL_Rect(round(center_x - w / 2), round(center_y - h / 2), w, h)),
+                _check_error=lambda rv: rv < 0
+            )
+        SDL_FreeSurface(source)
+
+        sdl_call(SDL_SetSurfaceBlendMode, baked, SDL_BLENDMODE_BLEND, _check_error=lambda rv: rv < 0)
+        return baked
+
+    def free(self, object, _SDL_FreeSurface=SDL_FreeSurface):
+        _SDL_FreeSurface(object)
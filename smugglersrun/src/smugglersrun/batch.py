@@ -0,0 +1,254 @@
+"""
+Simulate many Sandbox runs in parallel and collect the results.
+
+Each run plays one level headless, driven by a script, from its own seed,
+until the level is won or lost. Runs are spread over a process pool and
+their results streamed, in run order, to one ``.npy`` file per column in
+the output directory, so the same arguments always write the same files:
+
+    python -m smugglersrun.batch results --levels 1 5 10 --runs 1000
+
+Load a column with ``numpy.load("results/finish_time.npy", mmap_mode="r")``.
+``--density``, ``--damage-chance`` and ``--bonus-time`` override the game's
+tuning constants for every run.
+"""
+import argparse
+import json
+import math
+import os
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Dict, Iterable, Iterator, Tuple
+
+import numpy as np
+import ppb
+from numpy.lib import format as npy_format
+from ppb import assetlib
+from ppb.systemslib import System
+
+from smugglersrun import clock
+from smugglersrun import sandbox
+from smugglersrun.headless import FixedStep, ScriptedController, scripts, seed_everything
+from smugglersrun.systems import CONTROL_NAMES, FrameClock
+
+COLUMNS: Dict[str, str] = {
+    "run": "<i8",
+    "level": "<i4",
+    "seed": "<i8",
+    "won": "|b1",
+    "frames": "<i4",
+    "finish_time": "<f8",
+    "remaining_time": "<f8",
+    "carried_time": "<f8",
+    "mine_hits": "<i4",
+    **{f"damage_{name}": "<i4" for name in CONTROL_NAMES},
+}
+
+
+@dataclass(frozen=True)
+class Task:
+    run: int
+    level: int
+    seed: int
+    frames: int
+    time_delta: float
+    script: str
+
+
+class RunMonitor(System):
+    """
+    Ends a run when its first level is won or lost.
+
+    Records the simulated time the player crossed the finish line, and the
+    remaining time the level hands to the next one when it's won.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.scene = None
+        self.started = None
+        self.finish_time = float("nan")
+        self.carried_time = float("nan")
+        self.won = False
+
+    def on_scene_started(self, event, signal):
+        if self.scene is None:
+            self.scene = event.scene
+            self.started = clock.now()
+
+    def on_idle(self, event, signal):
+        if self.scene is not None and self.scene.finished and math.isnan(self.finish_time):
+            self.finish_time = event.now - self.started
+
+    def on_replace_scene(self, event, signal):
+        self.won = True
+        self.carried_time = event.kwargs["remaining_time"]
+        signal(ppb.events.Quit())
+
+    def on_stop_scene(self, event, signal):
+        signal(ppb.events.Quit())
+
+
+def simulate(task: Task) -> Tuple:
+    seed_everything(task.seed)
+    virtual_clock = clock.VirtualClock()
+    clock.set_source(virtual_clock)
+    components = sandbox.Components(sandbox.CONFIG_STARTING_DAMAGE)
+    engine = ppb.GameEngine(
+        sandbox.Sandbox,
+        scene_kwargs={"difficulty_level": task.level, "components": components},
+        basic_systems=(FixedStep, assetlib.AssetLoadingSystem),
+        systems=[FrameClock, ScriptedController, RunMonitor],
+        virtual_clock=virtual_clock,
+        time_delta=task.time_delta,
+        frames=task.frames,
+        script=scripts[task.script],
+    )
+    try:
+        with engine:
+            engine.start()
+            engine.main_loop()
+    finally:
+        clock.set_source(perf_counter)
+    frames = next(system for system in engine.systems if isinstance(system, FixedStep)).frame
+    monitor = next(system for system in engine.systems if isinstance(system, RunMonitor))
+    scene = monitor.scene
+    return (
+        task.run, task.level, task.seed, monitor.won, frames,
+        monitor.finish_time, scene.remaining_time, monitor.carried_time, scene.player.mine_hits,
+        *scene.player.components.damage.tolist(),
+    )
+
+
+def tune(density: float = None, damage_chance: float = None, bonus_time: float = None):
+    """
+    Override the game's tuning constants in this process.
+    """
+    if density is not None:
+        sandbox.Sandbox.CONFIG_DENSITY_MODIFER = density
+    if damage_chance is not None:
+        sandbox.CONFIG_DAMAGE_CHANCE_INCREASE = damage_chance
+    if bonus_time is not None:
+        sandbox.Sandbox.CONFIG_BONUS_TIME = bonus_time
+
+
+class ColumnWriter:
+    """
+    Appends rows to one ``.npy`` file per column.
+
+    Rows are buffered and written ``block`` at a time. Each file's header is
+    rewritten with the final row count on close.
+    """
+
+    def __init__(self, directory: Path, columns: Dict[str, str], *, block: int = 1024):
+        directory.mkdir(parents=True, exist_ok=True)
+        self.columns = columns
+        self.block = block
+        self.rows = 0
+        self.pending = []
+        self.files = {name: open(directory / f"{name}.npy", "wb") for name in columns}
+        for name, file in self.files.items():
+            self._write_header(file, columns[name], 0)
+        self.header_size = file.tell()
+
+    @staticmethod
+    def _write_header(file, dtype: str, rows: int):
+        npy_format.write_array_header_1_0(file, {"descr": dtype, "fortran_order": False, "shape": (rows,)})
+
+    def append(self, row: Tuple):
+        self.pending.append(row)
+        if len(self.pending) >= self.block:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        for (name, dtype), values in zip(self.columns.items(), zip(*self.pending)):
+            self.files[name].write(np.array(values, dtype=dtype).tobytes())
+        self.rows += len(self.pending)
+        self.pending.clear()
+
+    def close(self):
+        self.flush()
+        for name, file in self.files.items():
+            file.flush()
+            end = file.tell()
+            file.seek(0)
+            self._write_header(file, self.columns[name], self.rows)
+            if file.tell() != self.header_size:
+                raise RuntimeError(f"Header for {name!r} changed size.")
+            file.seek(end)
+            file.close()
+
+
+def tasks(levels: Iterable[int], runs: int, *, seed: int, frames: int, time_delta: float, script: str):
+    run = 0
+    for level in levels:
+        for _ in range(runs):
+            yield Task(run, level, seed + run, frames, time_delta, script)
+            run += 1
+
+
+def bounded_map(executor: Executor, fn: Callable, iterable: Iterable, window: int) -> Iterator:
+    """
+    Like ``executor.map``, but with at most ``window`` calls submitted and
+    not yet yielded at a time, so a long ``iterable`` isn't queued up front.
+    """
+    pending = deque()
+    for item in iterable:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def write_rows(writer: ColumnWriter, rows: Iterable[Tuple]):
+    """
+    Append every row and close the writer, even if the rows stop with an
+    error, so the runs finished so far stay loadable.
+    """
+    try:
+        for row in rows:
+            writer.append(row)
+    finally:
+        writer.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output", type=Path, help="Directory to write the columns to.")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 10, 25, 50, 100])
+    parser.add_argument("--runs", type=int, default=100, help="Runs per level.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first run; each run adds its index.")
+    parser.add_argument("--frames", type=int, default=10_000, help="Frames before a run is cut off.")
+    parser.add_argument("--time-delta", type=float, default=0.016)
+    parser.add_argument("--script", choices=sorted(scripts), default="autopilot")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--window", type=int, help="Runs queued at a time; defaults to 4 per worker.")
+    parser.add_argument("--density", type=float, help="Override Sandbox.CONFIG_DENSITY_MODIFER.")
+    parser.add_argument("--damage-chance", type=float, help="Override CONFIG_DAMAGE_CHANCE_INCREASE.")
+    parser.add_argument("--bonus-time", type=float, help="Override Sandbox.CONFIG_BONUS_TIME.")
+    args = parser.parse_args(argv)
+    if args.window is None:
+        args.window = args.workers * 4
+
+    overrides = {"density": args.density, "damage_chance": args.damage_chance, "bonus_time": args.bonus_time}
+    writer = ColumnWriter(args.output, COLUMNS)
+    with open(args.output / "settings.json", "w") as settings:
+        json.dump({key: value for key, value in vars(args).items() if key != "output"}, settings, indent=2)
+
+    start = perf_counter()
+    with ProcessPoolExecutor(args.workers, initializer=tune, initargs=tuple(overrides.values())) as executor:
+        work = tasks(args.levels, args.runs, seed=args.seed, frames=args.frames,
+                     time_delta=args.time_delta, script=args.script)
+        write_rows(writer, bounded_map(executor, simulate, work, args.window))
+    elapsed = perf_counter() - start
+    print(f"{writer.rows} runs in {elapsed:.2f}s on {args.workers} workers, {writer.rows / elapsed:.1f} runs/s")
+
+
+if __name__ == "__main__":
+    main()
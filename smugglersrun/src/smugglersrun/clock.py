@@ -0,0 +1,38 @@
+"""
+The game's time source.
+
+Game code asks :func:`now` for the time instead of calling perf_counter
+directly, so a :class:`VirtualClock` can stand in for the real one when the
+simulation needs to be deterministic.
+"""
+from time import perf_counter
+from typing import Callable
+
+_source: Callable[[], float] = perf_counter
+
+
+class VirtualClock:
+    """
+    A clock that only moves when it's told to.
+    """
+
+    def __init__(self, start: float = 0):
+        self.time = start
+
+    def __call__(self) -> float:
+        return self.time
+
+    def advance(self, seconds: float):
+        self.time += seconds
+
+
+def now() -> float:
+    return _source()
+
+
+def set_source(source: Callable[[], float]):
+    """
+    Replace the time source. Pass perf_counter to go back to real time.
+    """
+    global _source
+    _source = source
@@ -0,0 +1,40 @@
+from collections import defaultdict
+from typing import Hashable, Iterable, Iterator, Type
+
+from ppb.scenes import GameObjectCollection
+
+
+class IndexedCollection(GameObjectCollection):
+    """
+    A GameObjectCollection that answers lookups from its indexes.
+
+    The base collection intersects the kind or tag index with every object on
+    each get(), which scans the whole scene. Here a kind-only or tag-only get
+    only touches the matching index, and remove only touches the tags the
+    object was added with.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.object_tags = defaultdict(set)
+
+    def add(self, game_object: Hashable, tags: Iterable[Hashable] = ()) -> None:
+        if not isinstance(tags, (str, bytes)):
+            tags = tuple(tags)
+        super().add(game_object, tags)
+        if tags:
+            self.object_tags[game_object].update(tags)
+
+    def get(self, *, kind: Type = None, tag: Hashable = None, **kwargs) -> Iterator:
+        if kind is not None and tag is None:
+            return iter(list(self.kinds.get(kind, ())))
+        if tag is not None and kind is None:
+            return iter(list(self.tags.get(tag, ())))
+        return super().get(kind=kind, tag=tag, **kwargs)
+
+    def remove(self, game_object: Hashable) -> None:
+        self.all.remove(game_object)
+        for kind in type(game_object).mro():
+            self.kinds[kind].remove(game_object)
+        for tag in self.object_tags.pop(game_object, ()):
+            self.tags[tag].discard(game_object)
@@ -1,7 +1,13 @@
 from ppb import Font
 
+from smugglersrun.assets import MENU, manifest
+from smugglersrun.glyphs import GlyphAtlas
+
 path = "smugglersrun/resources/anita_semi_square.ttf"
 color = (255, 255, 255)
 
-title = Font(path, size=72)
-button = Font(path, size=32)
+title = manifest.lazy(MENU, Font, path, size=72)
+button = manifest.lazy(MENU, Font, path, size=32)
+
+title_atlas = manifest.lazy(MENU, GlyphAtlas, title, color=color)
+button_atlas = manifest.lazy(MENU, GlyphAtlas, button, color=color)
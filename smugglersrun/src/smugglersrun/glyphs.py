@@ -0,0 +1,157 @@
+"""
+Text drawn from pre-rasterized glyph atlases.
+
+ppb.Text runs the whole string through SDL_ttf every time one is built, which
+is expensive for strings that change every frame like the race timer. A
+GlyphAtlas rasterizes each character of a font once, and AtlasText composes
+strings by blitting from it.
+"""
+import ctypes
+import string
+
+from ppb import Text
+from ppb.assetlib import AbstractAsset, ChainingMixin, FreeingMixin
+from ppb.systems._sdl_utils import sdl_call, ttf_call
+from ppb.systems.text import _freetype_lock
+from sdl2 import SDL_BLENDMODE_BLEND
+from sdl2 import SDL_BLENDMODE_NONE
+from sdl2 import SDL_BlitSurface
+from sdl2 import SDL_Color
+from sdl2 import SDL_CreateRGBSurfaceWithFormat
+from sdl2 import SDL_FreeSurface
+from sdl2 import SDL_PIXELFORMAT_ARGB8888
+from sdl2 import SDL_Rect
+from sdl2 import SDL_SetSurfaceBlendMode
+from sdl2.sdlttf import TTF_RenderUTF8_Blended
+
+CHARSET = string.digits + string.ascii_letters + string.punctuation + " "
+
+
+def _create_surface(width, height):
+    return sdl_call(
+        SDL_CreateRGBSurfaceWithFormat, 0, width, height, 32, SDL_PIXELFORMAT_ARGB8888,
+        _check_error=lambda rv: not rv
+    )
+
+
+class GlyphAtlas(ChainingMixin, FreeingMixin, AbstractAsset):
+    """
+    Every character of ``charset`` rendered once into a single surface.
+    """
+
+    def __init__(self, font, *, color=(0, 0, 0), charset=CHARSET):
+        self.font = font
+        self.color = color
+        self.charset = frozenset(charset)
+        self._order = "".join(sorted(self.charset))
+        self.glyphs = {}
+
+        self._start(self.font)
+
+    def __repr__(self):
+        return f"<{type(self).__name__} font={self.font!r} color={self.color!r}{' loaded' if self.is_loaded() else ''} at 0x{id(self):x}>"
+
+    def _background(self):
+        glyphs = []
+        with _freetype_lock:
+            for char in self._order:
+                glyphs.append(ttf_call(
+                    TTF_RenderUTF8_Blended, self.font.load(), char.encode('utf-8'),
+                    SDL_Color(*self.color),
+                    _check_error=lambda rv: not rv
+                ))
+
+        width = sum(glyph.contents.w for glyph in glyphs)
+        height = max(glyph.contents.h for glyph in glyphs)
+        atlas = _create_surface(width, height)
+
+        x = 0
+        for char, glyph in zip(self._order, glyphs):
+            w, h = glyph.contents.w, glyph.contents.h
+            # Copy the glyph's alpha instead of blending onto the empty atlas.
+            sdl_call(SDL_SetSurfaceBlendMode, glyph, SDL_BLENDMODE_NONE, _check_error=lambda rv: rv < 0)
+            sdl_call(
+                SDL_BlitSurface, glyph, None, atlas, ctypes.byref(SDL_Rect(x, 0, w, h)),
+                _check_error=lambda rv: rv < 0
+            )
+            SDL_FreeSurface(glyph)
+            self.glyphs[char] = SDL_Rect(x, 0, w, h)
+            x += w
+
+        sdl_call(SDL_SetSurfaceBlendMode, atlas, SDL_BLENDMODE_NONE, _check_error=lambda rv: rv < 0)
+        return atlas
+
+    def can_render(self, txt: str) -> bool:
+        return self.charset.issuperset(txt)
+
+    def render(self, txt: str):
+        """
+        Compose a new surface for the given string.
+
+        Every character must be in the atlas, see :meth:`can_render`.
+        """
+        atlas = self.load()
+        rects = [self.glyphs[char] for char in txt]
+        width = max(sum(rect.w for rect in rects), 1)
+        height = atlas.contents.h
+        surface = _create_surface(width, height)
+
+        x = 0
+        for rect in rects:
+            sdl_call(
+                SDL_BlitSurface, atlas, ctypes.byref(rect), surface,
+                ctypes.byref(SDL_Rect(x, 0, rect.w, rect.h)),
+                _check_error=lambda rv: rv < 0
+            )
+            x += rect.w
+
+        sdl_call(SDL_SetSurfaceBlendMode, surface, SDL_BLENDMODE_BLEND, _check_error=lambda rv: rv < 0)
+        return surface
+
+    def free(self, object, _SDL_FreeSurface=SDL_FreeSurface):
+        _SDL_FreeSurface(object)
+
+
+class AtlasText(FreeingMixin, AbstractAsset):
+    """
+    A string composed from a GlyphAtlas the first time it's drawn.
+    """
+    _surface = None
+
+    def __init__(self, txt, *, atlas: GlyphAtlas):
+        self.txt = txt
+        self.atlas = atlas
+
+    def __repr__(self):
+        return f"<{type(self).__name__} txt={self.txt!r} atlas={self.atlas!r}{' loaded' if self.is_loaded() else ''} at 0x{id(self):x}>"
+
+    def is_loaded(self):
+        return self._surface is not None
+
+    def load(self, timeout: float = None):
+        if self._surface is None:
+            self._surface = self.atlas.render(self.txt)
+        return self._surface
+
+    def free(self, object, _SDL_FreeSurface=SDL_FreeSurface):
+        _SDL_FreeSurface(object)
+
+
+class AtlasTextMixin:
+    """
+    Gives a sprite a text image that's only rebuilt when the string changes.
+
+    Strings with characters missing from the atlas fall back to ppb.Text.
+    """
+    atlas: GlyphAtlas
+    _image_text = None
+    _image = None
+
+    def text_image(self, txt: str):
+        if txt != self._image_text:
+            self._image_text = txt
+            if self.atlas.can_render(txt):
+                self._image = AtlasText(txt, atlas=self.atlas)
+            else:
+                self._image = Text(txt, font=self.atlas.font, color=self.atlas.color)
+        return self._image
@@ -0,0 +1,181 @@
+"""
+Run the Sandbox without a window, input or audio.
+
+The simulation advances at a fixed time step on a virtual clock, driven by a
+scripted control stream, with every random source seeded. Frames run as
+fast as the machine allows, so the frame rate and per-handler timings it
+prints are a measure of simulation cost alone:
+
+    python -m smugglersrun.headless --levels 1 10 50 100 --frames 1200
+"""
+import argparse
+import random
+from dataclasses import replace
+from time import perf_counter
+from typing import Callable, Dict
+
+import ppb
+from ppb import assetlib
+from ppb.camera import Camera
+from ppb.systemslib import System
+
+from smugglersrun import clock
+from smugglersrun import sandbox
+from smugglersrun.systems import Controller, Controls, FrameClock, Profiler
+from smugglersrun.systems.controller import NEUTRAL
+
+RESOLUTION = (1280, 720)
+
+Script = Callable[[int, ppb.BaseScene], Controls]
+
+FORWARD = replace(NEUTRAL, forward=True)
+
+
+def idle(frame: int, scene: ppb.BaseScene) -> Controls:
+    return NEUTRAL
+
+
+def full_throttle(frame: int, scene: ppb.BaseScene) -> Controls:
+    return FORWARD
+
+
+def autopilot(frame: int, scene: ppb.BaseScene) -> Controls:
+    """
+    Thrust forward while holding the ship upright and near the center line.
+    """
+    player = getattr(scene, "player", None)
+    if player is None:
+        return idle(frame, scene)
+    return Controls(
+        forward=True,
+        backwards=False,
+        left=player.position.x > 1,
+        right=player.position.x < -1,
+        rotate_left=player.rotation < -2,
+        rotate_right=player.rotation > 2,
+    )
+
+
+scripts: Dict[str, Script] = {
+    "idle": idle,
+    "full_throttle": full_throttle,
+    "autopilot": autopilot,
+}
+
+
+class ScriptedController(Controller):
+    """
+    A Controller whose buttons are set by a script instead of the keyboard.
+    """
+
+    def __init__(self, *, script: Script, **kwargs):
+        super().__init__(**kwargs)
+        self.script = script
+        self.frame = 0
+
+    def on_idle(self, event, signal):
+        controls = self.script(self.frame, event.scene)
+        if controls != self.controls:
+            self.controls = controls
+        self.frame += 1
+
+
+class FixedStep(System):
+    """
+    Stands in for the Updater and Renderer.
+
+    Every Idle advances the virtual clock by one time step and signals one
+    Update and one PreRender. Signals Quit after the given number of frames.
+    """
+
+    def __init__(self, *, virtual_clock: clock.VirtualClock, time_delta: float, frames: int, **kwargs):
+        super().__init__(**kwargs)
+        self.virtual_clock = virtual_clock
+        self.time_delta = time_delta
+        self.frames = frames
+        self.frame = 0
+
+    def on_scene_started(self, event, signal):
+        event.scene.main_camera = Camera(None, 25, RESOLUTION)
+
+    def on_idle(self, event, signal):
+        if self.frame >= self.frames:
+            signal(ppb.events.Quit())
+            return
+        self.virtual_clock.advance(self.time_delta)
+        signal(ppb.events.Update(self.time_delta))
+        signal(ppb.events.PreRender())
+        self.frame += 1
+
+
+def seed_everything(seed: int):
+    random.seed(seed)
+    for offset, factory in enumerate(sandbox.randomizers):
+        factory.reseed(seed + offset)
+
+
+def run_level(difficulty_level: int, *, frames: int, time_delta: float, seed: int, script: Script,
+              trace: str = None):
+    seed_everything(seed)
+    virtual_clock = clock.VirtualClock()
+    clock.set_source(virtual_clock)
+    components = sandbox.Components(sandbox.CONFIG_STARTING_DAMAGE)
+    engine = ppb.GameEngine(
+        sandbox.Sandbox,
+        scene_kwargs={"difficulty_level": difficulty_level, "components": components},
+        basic_systems=(FixedStep, assetlib.AssetLoadingSystem),
+        systems=[FrameClock, ScriptedController, Profiler],
+        virtual_clock=virtual_clock,
+        time_delta=time_delta,
+        frames=frames,
+        script=script,
+        profile_overlay=False,
+        profile_trace=trace,
+    )
+    try:
+        with engine:
+            engine.start()
+            start = perf_counter()
+            engine.main_loop()
+            elapsed = perf_counter() - start
+    finally:
+        clock.set_source(perf_counter)
+    simulated = next(system for system in engine.systems if isinstance(system, FixedStep)).frame
+    profiler = next(system for system in engine.systems if isinstance(system, Profiler))
+    return simulated, elapsed, profiler
+
+
+def report(difficulty_level, frames, elapsed, profiler: Profiler, *, top):
+    print(f"level {difficulty_level}: {frames} frames in {elapsed:.3f}s, {frames / elapsed:.1f} fps")
+    for name, (samples, total) in profiler.counter_totals.items():
+        print(f"    {name:40} {total / samples:10.1f} per frame")
+    ranked = sorted(profiler.totals.items(), key=lambda item: item[1][1], reverse=True)
+    for name, (calls, total) in ranked[:top]:
+        print(f"    {name:40} {calls:8} calls {total * 1000:10.2f} ms {total / calls * 1e6:9.2f} us/call")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 10, 25, 50, 100])
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--time-delta", type=float, default=0.016)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--script", choices=sorted(scripts), default="autopilot")
+    parser.add_argument("--top", type=int, default=10, help="Handlers to list per level.")
+    parser.add_argument("--trace", help="Write a Chrome trace of each level to TRACE, formatted with the level.")
+    args = parser.parse_args(argv)
+
+    for difficulty_level in args.levels:
+        frames, elapsed, profiler = run_level(
+            difficulty_level,
+            frames=args.frames,
+            time_delta=args.time_delta,
+            seed=args.seed,
+            script=scripts[args.script],
+            trace=args.trace and args.trace.format(difficulty_level),
+        )
+        report(difficulty_level, frames, elapsed, profiler, top=args.top)
+
+
+if __name__ == "__main__":
+    main()
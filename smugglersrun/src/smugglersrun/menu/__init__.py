@@ -1,29 +1,31 @@
-from ppb import BaseScene, RectangleSprite, Text, Vector
+from ppb import BaseScene, RectangleSprite, Vector
 from ppb.buttons import Primary
 from ppb.events import ButtonReleased, StartScene, StopScene
 
 from smugglersrun import font
+from smugglersrun.assets import MENU, manifest
+from smugglersrun.glyphs import AtlasTextMixin
 from smugglersrun.sandbox import Sandbox
 from smugglersrun.systems import BackgroundMusic, QueueBackgroundMusic
 from smugglersrun.utils import sprite_contains_point
 
 
-class Display(RectangleSprite):
+class Display(AtlasTextMixin, RectangleSprite):
     height = 0.5
     text: str = "Default Text"
-    font = font.button
+    atlas = font.button_atlas
 
     @property
     def image(self):
-        return Text(self.text, font=self.font, color=font.color)
+        return self.text_image(self.text)
 
 
 class LargeDisplay(Display):
     height = 2
-    font = font.title
+    atlas = font.title_atlas
 
 
-bgm = BackgroundMusic("smugglersrun/resources/bgm.wav", play_forever=True)
+bgm = manifest.lazy(MENU, BackgroundMusic, "smugglersrun/resources/bgm.wav", play_forever=True)
 
 
 class Credits(BaseScene):
@@ -0,0 +1,112 @@
+import logging
+from typing import List, Type
+
+import ppb
+
+from smugglersrun.transforms import TransformTree
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_RECYCLE = "recycle"
+OVERFLOW_DROP = "drop"
+
+
+class Particle(ppb.Sprite):
+    """
+    A pooled sprite owned by a ParticleEmitter.
+
+    Subclasses should report a size of 0 while inactive so the renderer skips
+    them. A particle emitted with a ``parent`` follows it at ``offset``.
+    """
+    active = False
+    start_time: float = 0
+    age: float = 0
+    run_time = 0.5
+    parent = None
+    offset = ppb.Vector(0, 0)
+
+
+class ParticleEmitter:
+    """
+    A fixed-capacity ring buffer of preallocated particles.
+
+    Particles are added to the scene once and reused, so emitting doesn't
+    allocate sprites or change scene membership. When every slot is live the
+    overflow policy decides what happens: ``OVERFLOW_RECYCLE`` restarts the
+    oldest live particle, ``OVERFLOW_DROP`` ignores the new emission.
+
+    Particles emitted with a parent are attached to ``transforms`` until
+    they expire.
+    """
+
+    def __init__(self, particle_class: Type[Particle], capacity: int, *,
+                 overflow: str = OVERFLOW_RECYCLE, name: str = None,
+                 transforms: TransformTree = None, **defaults):
+        if overflow not in (OVERFLOW_RECYCLE, OVERFLOW_DROP):
+            raise ValueError(f"Unknown overflow policy {overflow!r}.")
+        self.name = name or particle_class.__name__
+        self.overflow = overflow
+        self.defaults = defaults
+        self.transforms = transforms
+        self.particles: List[Particle] = [particle_class(**defaults) for _ in range(capacity)]
+        self.head = 0
+        self.live = 0
+        self.peak_live = 0
+        self.recycled = 0
+        self.dropped = 0
+
+    def add_to(self, scene: ppb.BaseScene):
+        scene.add(self)
+        for particle in self.particles:
+            scene.add(particle)
+
+    def emit(self, **kwargs):
+        """
+        Start the next particle in the ring with the given attributes.
+
+        Returns the particle, or None if the emission was dropped.
+        """
+        particle = self.particles[self.head]
+        if particle.active:
+            if self.overflow == OVERFLOW_DROP:
+                self.dropped += 1
+                return None
+            self.recycled += 1
+        else:
+            self.live += 1
+            if self.live > self.peak_live:
+                self.peak_live = self.live
+        self.head = (self.head + 1) % len(self.particles)
+
+        for key, value in self.defaults.items():
+            setattr(particle, key, value)
+        for key, value in kwargs.items():
+            setattr(particle, key, value)
+        particle.age = 0
+        particle.active = True
+        if self.transforms is not None:
+            self.transforms.detach(particle)
+        if particle.parent is not None:
+            if self.transforms is None:
+                raise ValueError(f"{self.name} has no TransformTree to attach particles to.")
+            self.transforms.attach(particle, particle.parent, particle.offset, inherit_rotation=False)
+        return particle
+
+    def on_pre_render(self, event, signal):
+        now = event.now
+        for particle in self.particles:
+            if not particle.active:
+                continue
+            particle.age = now - particle.start_time
+            if particle.age >= particle.run_time:
+                particle.active = False
+                if particle.parent is not None:
+                    self.transforms.detach(particle)
+                    particle.parent = None
+                self.live -= 1
+
+    def on_scene_stopped(self, event, signal):
+        logger.info(
+            "%s pool: capacity %s, peak live %s, recycled %s, dropped %s",
+            self.name, len(self.particles), self.peak_live, self.recycled, self.dropped
+        )
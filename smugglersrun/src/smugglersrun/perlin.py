@@ -4,9 +4,19 @@ Perlin noise implementation.
 From https://eev.ee/blog/2016/05/29/perlin-noise/
 """
 # Licensed under ISC
+from collections import OrderedDict
 from itertools import product
 import math
 import random
+import sys
+
+import numpy as np
+
+
+def _entry_size(grid_point, gradient):
+    """Approximate bytes held by one gradient cache entry."""
+    return (sys.getsizeof(grid_point) + sys.getsizeof(gradient)
+            + sum(sys.getsizeof(coord) for coord in grid_point + gradient))
 
 
 def smoothstep(t):
@@ -27,9 +37,13 @@ class PerlinNoiseFactory(object):
     integers.
     There is no limit to the coordinates used; new gradients are generated on
     the fly as necessary.
+    Gradients are derived from the seed and the grid point, so only the most
+    recently used ones are kept around; an evicted gradient comes back
+    identical if it's needed again.
     """
 
-    def __init__(self, dimension, octaves=1, tile=(), unbias=False):
+    def __init__(self, dimension, octaves=1, tile=(), unbias=False, seed=None,
+                 cache_size=1024):
         """Create a new Perlin noise factory in the given number of dimensions,
         which should be an integer and at least 1.
         More octaves create a foggier and more-detailed noise pattern.  More
@@ -41,6 +55,9 @@ class PerlinNoiseFactory(object):
         If ``unbias`` is true, the smoothstep function will be applied to the
         output before returning it, to counteract some of Perlin noise's
         significant bias towards the center of its output range.
+        ``seed`` picks the noise pattern; by default one is drawn from the
+        ``random`` module.  At most ``cache_size`` gradients are kept in
+        memory.
         """
         self.dimension = dimension
         self.octaves = octaves
@@ -51,26 +68,81 @@ class PerlinNoiseFactory(object):
         # by this to scale to ±1
         self.scale_factor = 2 * dimension ** -0.5
 
-        self.gradient = {}
+        self.cache_size = cache_size
+        self.gradient = OrderedDict()
+        self.gradient_bytes = 0
+        self.evictions = 0
+        self.reseed(random.getrandbits(64) if seed is None else seed)
+
+    def reseed(self, seed):
+        """Switch to the noise pattern for the given seed."""
+        self.seed = seed
+        self.gradient.clear()
+        self.gradient_bytes = 0
 
-    def _generate_gradient(self):
+    def _generate_gradient(self, grid_point):
         # Generate a random unit vector at each grid point -- this is the
         # "gradient" vector, in that the grid tile slopes towards it
 
+        # Seeding from a string hashes it with sha512, which is the same on
+        # every platform and in every process.
+        rng = random.Random("{}:{}".format(
+            self.seed, ",".join(str(coord) for coord in grid_point)))
+
         # 1 dimension is special, since the only unit vector is trivial;
         # instead, use a slope between -1 and 1
         if self.dimension == 1:
-            return (random.uniform(-1, 1),)
+            return (rng.uniform(-1, 1),)
 
         # Generate a random point on the surface of the unit n-hypersphere;
         # this is the same as a random unit vector in n dimensions.  Thanks
         # to: http://mathworld.wolfram.com/SpherePointPicking.html
         # Pick n normal random variables with stddev 1
-        random_point = [random.gauss(0, 1) for _ in range(self.dimension)]
+        random_point = [rng.gauss(0, 1) for _ in range(self.dimension)]
         # Then scale the result to a unit vector
         scale = sum(n * n for n in random_point) ** -0.5
         return tuple(coord * scale for coord in random_point)
 
+    def _get_gradient(self, grid_point):
+        gradients = self.gradient
+        try:
+            gradient = gradients[grid_point]
+        except KeyError:
+            gradient = gradients[grid_point] = self._generate_gradient(grid_point)
+            self.gradient_bytes += _entry_size(grid_point, gradient)
+            if len(gradients) > self.cache_size:
+                self.gradient_bytes -= _entry_size(*gradients.popitem(last=False))
+                self.evictions += 1
+        else:
+            gradients.move_to_end(grid_point)
+        return gradient
+
+    def gradient_memory(self):
+        """Approximate bytes held by the gradient cache."""
+        return sys.getsizeof(self.gradient) + self.gradient_bytes
+
+    def _gradient_array(self, grid_points):
+        """Look up (or generate) the gradients for an (n, dimension) array of
+        integer grid points.  Each distinct grid point is only looked up once.
+        """
+        # Flatten each grid point to a single integer so the unique pass is
+        # one-dimensional, which is much faster than np.unique(axis=0).
+        # Points too far apart to number every cell between them fall back
+        # to the slow pass.
+        low = grid_points.min(axis=0)
+        span = grid_points.max(axis=0) - low + 1
+        if math.prod(span.tolist()) <= np.iinfo(np.intp).max:
+            keys = np.ravel_multi_index(tuple((grid_points - low).T), tuple(span))
+            unique_keys, inverse = np.unique(keys, return_inverse=True)
+            unique = np.stack(np.unravel_index(unique_keys, tuple(span)), axis=1) + low
+        else:
+            unique, inverse = np.unique(grid_points, axis=0, return_inverse=True)
+        get_gradient = self._get_gradient
+        gradients = np.array([
+            get_gradient(tuple(grid_point)) for grid_point in unique.tolist()
+        ], dtype=float)
+        return gradients[inverse.reshape(-1)]
+
     def get_plain_noise(self, *point):
         """Get plain noise for a single point, without taking into account
         either octaves or tiling.
@@ -79,6 +151,9 @@ class PerlinNoiseFactory(object):
             raise ValueError("Expected {} values, got {}".format(
                 self.dimension, len(point)))
 
+        if self.dimension == 1:
+            return self._get_plain_noise_1d(point[0])
+
         # Build a list of the (min, max) bounds in each dimension
         grid_coords = []
         for coord in point:
@@ -91,9 +166,7 @@ class PerlinNoiseFactory(object):
         # gradient's "influence" on the chosen point.
         dots = []
         for grid_point in product(*grid_coords):
-            if grid_point not in self.gradient:
-                self.gradient[grid_point] = self._generate_gradient()
-            gradient = self.gradient[grid_point]
+            gradient = self._get_gradient(grid_point)
 
             dot = 0
             for i in range(self.dimension):
@@ -121,6 +194,111 @@ class PerlinNoiseFactory(object):
 
         return dots[0] * self.scale_factor
 
+    def _get_plain_noise_1d(self, x):
+        """The same arithmetic as get_plain_noise, without the bookkeeping
+        needed for an arbitrary number of dimensions.
+        """
+        min_coord = math.floor(x)
+        max_coord = min_coord + 1
+        min_dot = self._get_gradient((min_coord,))[0] * (x - min_coord)
+        max_dot = self._get_gradient((max_coord,))[0] * (x - max_coord)
+        return lerp(smoothstep(x - min_coord), min_dot, max_dot) * self.scale_factor
+
+    def get_plain_noise_batch(self, points):
+        """Get plain noise for an (n, dimension) array of points at once.
+
+        Gives exactly the same values as calling get_plain_noise on each
+        point.
+        """
+        points = np.asarray(points, dtype=float)
+        if points.ndim != 2 or points.shape[1] != self.dimension:
+            raise ValueError("Expected an array of shape (n, {}), got {}".format(
+                self.dimension, points.shape))
+
+        if self.dimension == 1:
+            return self._get_plain_noise_batch_1d(points[:, 0])
+
+        min_coords = np.floor(points).astype(np.int64)
+
+        # Same corner order as product() in get_plain_noise: the last
+        # dimension alternates fastest.
+        corners = np.array(list(product((0, 1), repeat=self.dimension)), dtype=np.int64)
+        grid_points = min_coords[np.newaxis, :, :] + corners[:, np.newaxis, :]
+        gradients = self._gradient_array(
+            grid_points.reshape(-1, self.dimension)
+        ).reshape(grid_points.shape)
+        distances = points[np.newaxis, :, :] - grid_points
+
+        dots = gradients[:, :, 0] * distances[:, :, 0]
+        for i in range(1, self.dimension):
+            dots = dots + gradients[:, :, i] * distances[:, :, i]
+
+        dim = self.dimension
+        while len(dots) > 1:
+            dim -= 1
+            s = smoothstep(points[:, dim] - min_coords[:, dim])
+            dots = lerp(s, dots[0::2], dots[1::2])
+
+        return dots[0] * self.scale_factor
+
+    def _get_plain_noise_batch_1d(self, x):
+        min_coords = np.floor(x).astype(np.int64)
+        max_coords = min_coords + 1
+
+        # Each cell's gradients are shared by its neighbours, so look up the
+        # unique cells once and index both ends from the same table.
+        cells, inverse = np.unique(min_coords, return_inverse=True)
+        get_gradient = self._get_gradient
+        slopes = np.array([
+            (get_gradient((cell,))[0], get_gradient((cell + 1,))[0])
+            for cell in cells.tolist()
+        ], dtype=float).reshape(-1, 2)
+        inverse = inverse.reshape(-1)
+
+        min_dots = slopes[inverse, 0] * (x - min_coords)
+        max_dots = slopes[inverse, 1] * (x - max_coords)
+        return lerp(smoothstep(x - min_coords), min_dots, max_dots) * self.scale_factor
+
+    def batch(self, points):
+        """Get the value of this Perlin noise function at many points at once.
+
+        ``points`` is an array of shape (n, dimension), or of shape (n,) for
+        1-dimensional noise.  Every octave of every point is evaluated in a
+        single pass.  Returns an array of n values, exactly equal to calling
+        the factory on each point.
+        """
+        points = np.asarray(points, dtype=float)
+        if self.dimension == 1 and points.ndim == 1:
+            points = points[:, np.newaxis]
+        if points.ndim != 2 or points.shape[1] != self.dimension:
+            raise ValueError("Expected an array of shape (n, {}), got {}".format(
+                self.dimension, points.shape))
+
+        count = len(points)
+        octave_points = []
+        for o in range(self.octaves):
+            o2 = 1 << o
+            scaled = points * o2
+            for i in range(self.dimension):
+                if self.tile[i]:
+                    scaled[:, i] %= self.tile[i] * o2
+            octave_points.append(scaled)
+        noise = self.get_plain_noise_batch(np.concatenate(octave_points))
+
+        ret = np.zeros(count)
+        for o in range(self.octaves):
+            ret = ret + noise[o * count:(o + 1) * count] / (1 << o)
+
+        ret /= 2 - 2 ** (1 - self.octaves)
+
+        if self.unbias:
+            r = (ret + 1) / 2
+            for _ in range(int(self.octaves / 2 + 0.5)):
+                r = smoothstep(r)
+            ret = r * 2 - 1
+
+        return ret
+
     def __call__(self, *point):
         """Get the value of this Perlin noise function at the given point.  The
         number of values given should match the number of dimensions.
@@ -155,4 +333,44 @@ class PerlinNoiseFactory(object):
                 r = smoothstep(r)
             ret = r * 2 - 1
 
-        return ret
\ No newline at end of file
+        return ret
+
+
+class PlainNoise1D(object):
+    """Plain noise from several 1-dimensional factories at the same point,
+    as a list with one value per factory.
+
+    Gives exactly the same values as calling get_plain_noise(x) on each
+    factory.  The gradients either side of x are looked up once per grid
+    cell, and again only when a factory is reseeded.
+    """
+
+    def __init__(self, factories):
+        self.factories = tuple(factories)
+        for factory in self.factories:
+            if factory.dimension != 1:
+                raise ValueError("Expected 1-dimensional factories, got {}".format(
+                    factory.dimension))
+        self._key = None
+        self._slopes = ()
+
+    def __call__(self, x):
+        min_coord = math.floor(x)
+        max_coord = min_coord + 1
+        key = (min_coord, *(factory.seed for factory in self.factories))
+        if key != self._key:
+            self._slopes = [
+                (factory._get_gradient((min_coord,))[0],
+                 factory._get_gradient((max_coord,))[0],
+                 factory.scale_factor)
+                for factory in self.factories
+            ]
+            self._key = key
+
+        min_distance = x - min_coord
+        max_distance = x - max_coord
+        s = smoothstep(min_distance)
+        return [
+            lerp(s, min_slope * min_distance, max_slope * max_distance) * scale_factor
+            for min_slope, max_slope, scale_factor in self._slopes
+        ]
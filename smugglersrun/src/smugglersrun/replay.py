@@ -0,0 +1,397 @@
+"""
+Record a Sandbox run's inputs and play them back.
+
+A recording holds everything needed to rebuild one level and drive it the
+same way again: the level's settings, its layout seed, the player's
+starting damage and the seed given to every random source, followed by one
+frame per Update with the controls, the time step and the Update's time.
+
+Set ``SMUGGLERSRUN_RECORD`` to a path to record each level the game plays;
+``{}`` in the path is replaced with the level's number in the session. Play
+a recording back without a window, as fast as possible or at its original
+pace, with:
+
+    python -m smugglersrun.replay session-1.srr [--realtime]
+
+The format is a fixed header and then, per frame, one byte of controls, the
+time step when it differs from the previous one, and the Update's time when
+it isn't the previous frame's time plus the time step. Both are stored as
+the XOR of their bits with the previous value's, so they round-trip exactly;
+with FixedUpdater's simulated clock most frames need neither. The header
+ends with the frame count and the byte length of the frames, filled in when
+the recording is closed, so a cut-off recording is refused when it's opened.
+"""
+import argparse
+import mmap
+import os
+import random
+import struct
+from dataclasses import dataclass
+from time import perf_counter
+from time import sleep
+from typing import BinaryIO, Iterator, Tuple
+
+import ppb
+from ppb import assetlib
+from ppb.camera import Camera
+from ppb.systemslib import System
+
+from smugglersrun import clock
+from smugglersrun import sandbox
+from smugglersrun.headless import RESOLUTION, report, seed_everything
+from smugglersrun.systems import CONTROL_NAMES, Controller, Controls, FrameClock, Profiler
+
+MAGIC = b"SRRP"
+VERSION = 4
+
+_header = struct.Struct("<4sHIQQdd6IdQQ")
+_float_bits = struct.Struct("<d")
+_bits = struct.Struct("<Q")
+
+_TIME_DELTA_CHANGED = 0x80
+_NOW_CHANGED = 0x40
+_CONTROLS = 0x3f
+
+
+@dataclass(frozen=True)
+class Header:
+    difficulty_level: int
+    layout_seed: int
+    seed: int
+    track_length: float
+    remaining_time: float
+    damage: Tuple[int, ...]
+    start_time: float
+
+
+@dataclass(frozen=True)
+class Frame:
+    controls: Controls
+    time_delta: float
+    now: float
+
+
+def pack_controls(controls: Controls) -> int:
+    bits = 0
+    for bit, name in enumerate(CONTROL_NAMES):
+        if getattr(controls, name):
+            bits |= 1 << bit
+    return bits
+
+
+def unpack_controls(bits: int) -> Controls:
+    return Controls(*(bool(bits & (1 << bit)) for bit in range(len(CONTROL_NAMES))))
+
+
+def _write_varint(buffer: bytearray, value: int):
+    while value >= 0x80:
+        buffer.append(value & 0x7f | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _read_varint(data, offset: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def _float_to_bits(value: float) -> int:
+    return _bits.unpack(_float_bits.pack(value))[0]
+
+
+def _bits_to_float(value: int) -> float:
+    return _float_bits.unpack(_bits.pack(value))[0]
+
+
+class RecordingWriter:
+    """
+    Writes a recording to an open binary file, one frame at a time.
+    """
+
+    def __init__(self, file: BinaryIO, header: Header):
+        self.file = file
+        self.header = header
+        self.frames = 0
+        self._buffer = bytearray()
+        self._time_delta_bits = 0
+        self._now = header.start_time
+        self._now_bits = _float_to_bits(header.start_time)
+        self._size = 0
+        self._write_header(0, 0)
+
+    def _write_header(self, frames: int, size: int):
+        header = self.header
+        self.file.write(_header.pack(
+            MAGIC, VERSION, header.difficulty_level, header.layout_seed, header.seed,
+            header.track_length, header.remaining_time, *header.damage, header.start_time,
+            frames, size
+        ))
+
+    def write(self, controls: Controls, time_delta: float, now: float):
+        buffer = self._buffer
+        bits = pack_controls(controls)
+        time_delta_bits = _float_to_bits(time_delta)
+        changed = time_delta_bits ^ self._time_delta_bits
+        if changed:
+            bits |= _TIME_DELTA_CHANGED
+        now_bits = _float_to_bits(now)
+        stepped = now_bits == _float_to_bits(self._now + time_delta)
+        if not stepped:
+            bits |= _NOW_CHANGED
+        buffer.append(bits)
+        if changed:
+            _write_varint(buffer, changed)
+            self._time_delta_bits = time_delta_bits
+        if not stepped:
+            _write_varint(buffer, now_bits ^ self._now_bits)
+        self._now = now
+        self._now_bits = now_bits
+        self.frames += 1
+        if len(buffer) >= 64 * 1024:
+            self.flush()
+
+    def flush(self):
+        self.file.write(self._buffer)
+        self._size += len(self._buffer)
+        self._buffer.clear()
+
+    def close(self):
+        self.flush()
+        self.file.seek(0)
+        self._write_header(self.frames, self._size)
+        self.file.close()
+
+
+class Recording:
+    """
+    A recording, memory-mapped so frames are decoded as they're read.
+
+    Raises ValueError if the file isn't a recording, or is shorter or longer
+    than its header says.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if size < _header.size:
+                raise ValueError(f"{path!r} is too short to be a recording.")
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, level, layout_seed, seed, track_length, remaining_time, *rest = _header.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise ValueError(f"{path!r} is not a version {VERSION} recording.")
+        *damage, start_time, self.frames, self.size = rest
+        self.header = Header(level, layout_seed, seed, track_length, remaining_time, tuple(damage), start_time)
+        if self.size != size - _header.size or (self.frames == 0) != (self.size == 0):
+            self._map.close()
+            raise ValueError(
+                f"{path!r} holds {size - _header.size} bytes of frames, but its header says "
+                f"{self.frames} frames in {self.size} bytes; it was cut off or not closed."
+            )
+
+    def __len__(self):
+        return self.frames
+
+    def __iter__(self) -> Iterator[Frame]:
+        data = self._map
+        end = len(data)
+        offset = _header.size
+        time_delta_bits = 0
+        now_bits = _float_to_bits(self.header.start_time)
+        frames = 0
+        try:
+            while offset < end:
+                bits = data[offset]
+                offset += 1
+                if bits & _TIME_DELTA_CHANGED:
+                    changed, offset = _read_varint(data, offset)
+                    time_delta_bits ^= changed
+                time_delta = _bits_to_float(time_delta_bits)
+                if bits & _NOW_CHANGED:
+                    changed, offset = _read_varint(data, offset)
+                    now_bits ^= changed
+                else:
+                    now_bits = _float_to_bits(_bits_to_float(now_bits) + time_delta)
+                frames += 1
+                yield Frame(unpack_controls(bits & _CONTROLS), time_delta, _bits_to_float(now_bits))
+        except IndexError:
+            raise ValueError(f"{self.path!r} ends part way through frame {frames + 1}.") from None
+        if frames != self.frames:
+            raise ValueError(f"{self.path!r} holds {frames} frames, but its header says {self.frames}.")
+
+    def close(self):
+        self._map.close()
+
+
+class Recorder(System):
+    """
+    Records every Sandbox level to ``record_path``.
+
+    When a level starts, the recorder reseeds every random source with a new
+    seed and writes the header; each Update in the level after that is
+    written as a frame. ``record_path`` is formatted with a count of the
+    levels recorded so far.
+    """
+
+    def __init__(self, *, engine: ppb.GameEngine, record_path: str, **kwargs):
+        super().__init__(engine=engine, **kwargs)
+        self.record_path = record_path
+        self.recorded = 0
+        self.scene = None
+        self.writer = None
+        engine.register(ppb.events.Update, self.record)
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def on_scene_started(self, event, signal):
+        self.stop()
+        scene = event.scene
+        if not isinstance(scene, sandbox.Sandbox):
+            return
+        seed = random.getrandbits(64)
+        seed_everything(seed)
+        header = Header(
+            difficulty_level=scene.difficulty_level,
+            layout_seed=scene.layout.seed,
+            seed=seed,
+            track_length=scene.layout.track_length,
+            remaining_time=scene.remaining_time,
+            damage=tuple(scene.player.components.damage.tolist()),
+            start_time=clock.now(),
+        )
+        self.recorded += 1
+        self.scene = scene
+        self.writer = RecordingWriter(open(self.record_path.format(self.recorded), "wb"), header)
+
+    def on_scene_stopped(self, event, signal):
+        if event.scene is self.scene:
+            self.stop()
+
+    def record(self, event):
+        if event.scene is self.scene and self.writer is not None:
+            self.writer.write(event.controls, event.time_delta, event.now)
+
+    def stop(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+            self.scene = None
+
+
+class Replayer(Controller):
+    """
+    Stands in for the Updater, Renderer and keyboard during a replay.
+
+    Seeds every random source when the level starts, as the Recorder did.
+    Every Idle plays one recorded frame: it sets the frame's controls,
+    signals its Update at the recorded time and a PreRender, and moves the
+    virtual clock on to the next frame's time for FrameClock to read. With ``realtime``, each
+    frame waits until its recorded time has passed since the replay started.
+    Signals Quit after the last frame.
+    """
+
+    def __init__(self, *, recording: Recording, virtual_clock: clock.VirtualClock,
+                 realtime: bool = False, **kwargs):
+        super().__init__(**kwargs)
+        self.frames = iter(recording)
+        self.virtual_clock = virtual_clock
+        self.realtime = realtime
+        self.seed = recording.header.seed
+        self.start_time = recording.header.start_time
+        self.scene = None
+        self.started = None
+        self.frame = 0
+        self.next_frame = next(self.frames, None)
+        if self.next_frame is not None:
+            virtual_clock.time = self.next_frame.now
+
+    def on_scene_started(self, event, signal):
+        seed_everything(self.seed)
+        self.scene = event.scene
+        self.scene.main_camera = Camera(None, 25, RESOLUTION)
+
+    def on_idle(self, event, signal):
+        frame = self.next_frame
+        if frame is None:
+            signal(ppb.events.Quit())
+            return
+        if self.realtime:
+            if self.started is None:
+                self.started = perf_counter()
+            wait = self.started + frame.now - self.start_time - perf_counter()
+            if wait > 0:
+                sleep(wait)
+        self.controls = frame.controls
+        update = ppb.events.Update(frame.time_delta)
+        update.now = frame.now
+        signal(update)
+        signal(ppb.events.PreRender())
+        self.frame += 1
+        self.next_frame = next(self.frames, None)
+        if self.next_frame is not None:
+            self.virtual_clock.time = self.next_frame.now
+
+
+def replay(recording: Recording, *, realtime: bool = False, trace: str = None):
+    header = recording.header
+    virtual_clock = clock.VirtualClock(header.start_time)
+    clock.set_source(virtual_clock)
+    components = sandbox.Components(header.damage)
+    layout = sandbox.Sandbox.make_layout(header.difficulty_level, header.track_length, seed=header.layout_seed)
+    try:
+        engine = ppb.GameEngine(
+            sandbox.Sandbox,
+            scene_kwargs={
+                "difficulty_level": header.difficulty_level,
+                "components": components,
+                "remaining_time": header.remaining_time,
+                "layout": layout,
+            },
+            basic_systems=(assetlib.AssetLoadingSystem,),
+            systems=[FrameClock, Replayer, Profiler],
+            recording=recording,
+            virtual_clock=virtual_clock,
+            realtime=realtime,
+            profile_overlay=False,
+            profile_trace=trace,
+        )
+        with engine:
+            engine.start()
+            start = perf_counter()
+            engine.main_loop()
+            elapsed = perf_counter() - start
+    finally:
+        clock.set_source(perf_counter)
+    replayer = next(system for system in engine.systems if isinstance(system, Replayer))
+    profiler = next(system for system in engine.systems if isinstance(system, Profiler))
+    return replayer, elapsed, profiler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recording")
+    parser.add_argument("--realtime", action="store_true", help="Play frames back at their recorded pace.")
+    parser.add_argument("--top", type=int, default=10, help="Handlers to list.")
+    parser.add_argument("--trace", help="Write a Chrome trace of the replay to TRACE.")
+    args = parser.parse_args(argv)
+
+    recording = Recording(args.recording)
+    replayer, elapsed, profiler = replay(recording, realtime=args.realtime, trace=args.trace)
+    report(recording.header.difficulty_level, replayer.frame, elapsed, profiler, top=args.top)
+    scene = replayer.scene
+    print(f"    player at {scene.player.position}, {scene.remaining_time:.3f}s left, "
+          f"damage {scene.player.components.as_dict()}")
+    recording.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,39 @@
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from itertools import product
+from dataclasses import field
+from itertools import chain
 from math import floor
+from math import inf
 from random import choice
 from random import random
 from random import uniform
-from time import perf_counter
-from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Tuple
 
+import numpy as np
 import ppb
 
+from smugglersrun import clock
 from smugglersrun import font
+from smugglersrun.assets import SANDBOX, manifest
+from smugglersrun.atlas import Atlas
+from smugglersrun.baking import BakedImage
+from smugglersrun.collection import IndexedCollection
+from smugglersrun.glyphs import AtlasTextMixin
+from smugglersrun.particles import OVERFLOW_DROP, Particle, ParticleEmitter
 from smugglersrun.perlin import PerlinNoiseFactory
+from smugglersrun.perlin import PlainNoise1D
+from smugglersrun.sandbox.layout import TrackLayout
+from smugglersrun.systems import CONTROL_NAMES
 from smugglersrun.systems import Controls
-from smugglersrun.utils import box_collide
+from smugglersrun.systems import SoundEffect
+from smugglersrun.transforms import TransformTree
+
+logger = logging.getLogger(__name__)
 
 # Game design assumptions:
 # 1. 1 unit ~= 35m
@@ -22,32 +43,30 @@ from smugglersrun.utils import box_collide
 CONFIG_STARTING_DAMAGE = 0
 CONFIG_DAMAGE_CHANCE_INCREASE = 0.1
 
+sprites = manifest.add(SANDBOX, Atlas("smugglersrun/resources/atlas.json"))
+
 damage_images = [
-    ppb.Image("smugglersrun/resources/laserBlue08.png"),
-    ppb.Image("smugglersrun/resources/laserBlue09.png"),
-    ppb.Image("smugglersrun/resources/laserBlue10.png"),
-    ppb.Image("smugglersrun/resources/laserBlue11.png"),
+    sprites.region("laserBlue08.png"),
+    sprites.region("laserBlue09.png"),
+    sprites.region("laserBlue10.png"),
+    sprites.region("laserBlue11.png"),
 ]
 
 shock_sounds = [
-    ppb.Sound("smugglersrun/resources/shock.wav"),
-    ppb.Sound("smugglersrun/resources/shock2.wav"),
-    ppb.Sound("smugglersrun/resources/shock3.wav"),
+    manifest.add(SANDBOX, SoundEffect("smugglersrun/resources/shock.wav", voices=2, priority=1)),
+    manifest.add(SANDBOX, SoundEffect("smugglersrun/resources/shock2.wav", voices=2, priority=1)),
+    manifest.add(SANDBOX, SoundEffect("smugglersrun/resources/shock3.wav", voices=2, priority=1)),
 ]
 
+beacon_image = sprites.region("beacon.png")
+_beacon_strips = {}
 
-@dataclass
-class Update(ppb.events.Update):
-    controls: Controls = None
+_layout_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="layout")
 
 
 @dataclass
-class Component:
-    control_name: str
-    operable: bool = True
-    damage: int = 0
-    CONFIG_MAX_DAMAGE = 100
-    randomizer: Callable[[float], float] = lambda _, __: random()
+class Update(ppb.events.Update):
+    controls: Controls = None
 
 
 main_random = PerlinNoiseFactory(1)
@@ -56,46 +75,109 @@ left_random = PerlinNoiseFactory(1)
 right_random = PerlinNoiseFactory(1)
 rot_left_random = PerlinNoiseFactory(1)
 rot_right_random = PerlinNoiseFactory(1)
+randomizers = (main_random, retro_random, left_random, right_random, rot_left_random, rot_right_random)
+
 
+class Components:
+    """
+    The ship's components, one per control, in CONTROL_NAMES order.
 
-class Shockwave(ppb.Sprite):
+    ``damage`` is a read-only array of each component's damage; it changes
+    through :meth:`roll`. A component malfunctions while its noise, from the
+    matching 1-dimensional factory in ``noise``, is below its share of
+    CONFIG_MAX_DAMAGE. A malfunctioning control does the opposite of what's
+    pressed.
+    """
+    names = CONTROL_NAMES
+    CONFIG_MAX_DAMAGE = 100
+    CONFIG_NOISE_PERIOD = 5
+
+    def __init__(self, damage=CONFIG_STARTING_DAMAGE, noise=randomizers):
+        self._damage = np.zeros(len(self.names), dtype=np.int64)
+        self._damage[:] = damage
+        self.damage = self._damage.view()
+        self.damage.flags.writeable = False
+        self.noise = PlainNoise1D(noise)
+        self._update_limits()
+        self._controls = None
+        self._pressed = ()
+
+    def __repr__(self):
+        return f"<{type(self).__name__} damage={self.as_dict()} at 0x{id(self):x}>"
+
+    def as_dict(self):
+        return dict(zip(self.names, self.damage.tolist()))
+
+    def _update_limits(self):
+        self._limits = (self._damage / self.CONFIG_MAX_DAMAGE).tolist()
+
+    def pressed(self, controls: Controls):
+        # Controls only change on input, so consecutive frames share one.
+        if controls is not self._controls:
+            self._pressed = [getattr(controls, name) for name in self.names]
+            self._controls = controls
+        return self._pressed
+
+    def resolve(self, controls: Controls, now: float) -> List[bool]:
+        """
+        Which controls are in effect at ``now``, after malfunctions.
+        """
+        noise = self.noise(now / self.CONFIG_NOISE_PERIOD)
+        return [
+            pressed != ((value + 1) / 2 < limit)
+            for value, limit, pressed in zip(noise, self._limits, self.pressed(controls))
+        ]
+
+    def roll(self, chance: float) -> List[int]:
+        """
+        Damage each component with probability ``chance``. Returns the
+        indices of the damaged components.
+        """
+        rolls = [random() for _ in self.names]
+        damaged = [index for index, roll in enumerate(rolls) if roll <= chance]
+        if damaged:
+            self._damage[damaged] += 1
+            self._update_limits()
+        return damaged
+
+
+def beacon_strip(offsets: Iterable) -> BakedImage:
+    """
+    A column of beacons baked into one image, shared by every column with
+    the same offsets.
+    """
+    offsets = tuple(offsets)
+    try:
+        return _beacon_strips[offsets]
+    except KeyError:
+        strip = _beacon_strips[offsets] = BakedImage(beacon_image, offsets, size=0.25)
+        return strip
+
+
+class Shockwave(Particle):
     image = ppb.Circle(165, 238, 235)
     starting_size = 0.1
     max_size = 2
     run_time = 0.5
-    start_time: float
-    parent = None
     opacity = 128
-    offset = ppb.Vector(0, 0)
     layer = 5
 
-    def on_pre_render(self, event, signal):
-        if perf_counter() - self.start_time >= self.run_time:
-            event.scene.remove(self)
-        if self.parent is not None:
-            self.position = self.parent.position + self.offset
-
     @property
     def size(self):
-        size = ((self.max_size - self.starting_size) / self.run_time) * ((perf_counter() - self.start_time) / self.run_time)
+        if not self.active:
+            return 0
+        size = ((self.max_size - self.starting_size) / self.run_time) * (self.age / self.run_time)
         return size
 
 
 class Player(ppb.Sprite):
-    image = ppb.Image("smugglersrun/resources/dev_ship.png")
+    image = sprites.region("dev_ship.png")
     basis = ppb.Vector(0, 1)
 
     velocity = ppb.Vector(0, 0)
     acceleration = ppb.Vector(0, 0)
     rotation_velocity = 0
-    components = {
-        "forward": Component("forward", damage=CONFIG_STARTING_DAMAGE, randomizer=lambda x: (main_random(x) + 1) / 2),
-        "backwards": Component("backwards", damage=CONFIG_STARTING_DAMAGE, randomizer=lambda x: (retro_random(x) + 1) / 2),
-        "left": Component("left", damage=CONFIG_STARTING_DAMAGE, randomizer=lambda x: (left_random(x) + 1) / 2),
-        "right": Component("right", damage=CONFIG_STARTING_DAMAGE, randomizer=lambda x: (right_random(x) + 1) / 2),
-        "rotate_left": Component("rotate_left", damage=CONFIG_STARTING_DAMAGE, randomizer=lambda x: (rot_left_random(x) + 1) / 2),
-        "rotate_right": Component("rotate_right", damage=CONFIG_STARTING_DAMAGE, randomizer=lambda x: (rot_right_random(x) + 1) / 2)
-    }
+    components = Components()
     forward_thrust_sprite: ppb.Sprite
     left_top_sprite: ppb.Sprite
     right_top_sprite: ppb.Sprite
@@ -103,17 +185,28 @@ class Player(ppb.Sprite):
     right_bottom_sprite: ppb.Sprite
     retro_sprite: ppb.Sprite
     last_sound = -100
+    mine_hits = 0
 
     CONFIG_THRUST_FORWARD = 4.5
     CONFIG_THRUST_LATERAL = 3
     CONFIG_THRUST_REVERSE = 2
-    CONFIG_ROTATION_PER_FRAME = 2.5
+    CONFIG_ROTATION_PER_SECOND = 156.25
     CONFIG_SOUND_COOL_DOWN = 0.3
 
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.previous_position = self.current_position = self.position
+        self.previous_rotation = self.current_rotation = self.rotation
+
     def on_update(self, event: Update, signal):
+        # Step from the last update's state, not from where it was drawn.
+        self.position = self.previous_position = self.current_position
+        self.rotation = self.previous_rotation = self.current_rotation
+
         acceleration = ppb.Vector(0, 0)
-        now = perf_counter()
+        now = event.now
         controls = event.controls
+        rotation = self.CONFIG_ROTATION_PER_SECOND * event.time_delta
 
         self.forward_thrust_sprite.opacity = 0
         self.retro_sprite.opacity = 0
@@ -122,115 +215,206 @@ class Player(ppb.Sprite):
         self.right_top_sprite.opacity = 0
         self.right_bottom_sprite.opacity = 0
 
-        if self.control_active(self.components["rotate_left"], controls, now):
-            self.rotate(self.CONFIG_ROTATION_PER_FRAME)
+        forward, backwards, left, right, rotate_left, rotate_right = self.components.resolve(controls, now)
+
+        if rotate_left:
+            self.rotate(rotation)
             self.right_top_sprite.opacity = 255
             self.left_bottom_sprite.opacity = 255
-        if self.control_active(self.components["rotate_right"], controls, now):
-            self.rotate(-self.CONFIG_ROTATION_PER_FRAME)
+        if rotate_right:
+            self.rotate(-rotation)
             self.left_top_sprite.opacity = 255
             self.right_bottom_sprite.opacity = 255
 
-        if self.control_active(self.components["forward"], controls, now):
+        if forward:
             acceleration += self.facing.scale_to(self.CONFIG_THRUST_FORWARD)
             self.forward_thrust_sprite.opacity = 255
 
-        if self.control_active(self.components["backwards"], controls, now):
+        if backwards:
             acceleration += self.facing.scale_to(self.CONFIG_THRUST_REVERSE) * -1
             self.retro_sprite.opacity = 255
 
-        if self.control_active(self.components["right"], controls, now):
+        if right:
             acceleration += self.facing.rotate(-90).scale_to(self.CONFIG_THRUST_LATERAL)
             self.left_top_sprite.opacity = 255
             self.left_bottom_sprite.opacity = 255
 
-        if self.control_active(self.components["left"], controls, now):
+        if left:
             acceleration += self.facing.rotate(90).scale_to(self.CONFIG_THRUST_LATERAL)
             self.right_top_sprite.opacity = 255
             self.right_bottom_sprite.opacity = 255
 
         self.velocity += acceleration * event.time_delta
         self.position += self.velocity * event.time_delta
-
-        damage_chance = 0
-        for mine in event.scene.get(kind=ShockMine):
-            if box_collide(self, mine):
-                damage_chance += CONFIG_DAMAGE_CHANCE_INCREASE
-                mine.emit()
-                if now - self.last_sound >= self.CONFIG_SOUND_COOL_DOWN:
-                    signal(ppb.events.PlaySound(choice(shock_sounds)))
-                    self.last_sound = now
-
-        component: Component
-        for component in self.components.values():
-            random_val = random()
-            if random_val <= damage_chance:
-                component.damage += 1
-                event.scene.add(
-                    Shockwave(
-                        image=choice(damage_images),
-                        max_size=0.25,
-                        run_time=0.25,
-                        start_time=now,
-                        offset=ppb.Vector(
-                            uniform(-1, 1),
-                            uniform(-1, 1)
-                        ),
-                        parent=self
-                    )
-                )
-
-    def on_pre_render(self, event, signal):
-        self.forward_thrust_sprite.position = self.position + (self.facing * -1)
-        self.forward_thrust_sprite.facing = self.facing
-
-        self.retro_sprite.position = self.position + self.facing.scale_to(0.7)
-        self.retro_sprite.facing = -self.facing
-
-
-        right_facing = self.facing.rotate(-90)
-
-        self.left_top_sprite.position = self.position + -right_facing.scale_to(.2) + self.facing.scale_to(.4)
-        self.left_bottom_sprite.position = self.position + -right_facing.scale_to(.7) + -self.facing.scale_to(.15)
-        self.left_bottom_sprite.facing = right_facing
-        self.left_top_sprite.facing = right_facing
-
-        self.right_top_sprite.position = self.position + right_facing.scale_to(.2) + self.facing.scale_to(.4)
-        self.right_bottom_sprite.position = self.position + right_facing.scale_to(.7) + -self.facing.scale_to(.15)
-        self.right_top_sprite.facing = -right_facing
-        self.right_bottom_sprite.facing = -right_facing
-
-    def control_active(self, component, controls, now):
-        now = perf_counter()
-        _random = component.randomizer(now / 5)
-        malfunction = _random < component.damage / component.CONFIG_MAX_DAMAGE
-        control_val = getattr(controls, component.control_name)
-        return (control_val and not malfunction) or (not control_val and malfunction)
+        self.current_position = self.position
+        self.current_rotation = self.rotation
+
+        mine_field = event.scene.mine_field
+        hits = mine_field.collide(self)
+        damage_chance = CONFIG_DAMAGE_CHANCE_INCREASE * len(hits)
+        if len(hits):
+            self.mine_hits += mine_field.emit(hits, now)
+            if now - self.last_sound >= self.CONFIG_SOUND_COOL_DOWN:
+                signal(ppb.events.PlaySound(choice(shock_sounds)))
+                self.last_sound = now
+
+        for _ in self.components.roll(damage_chance):
+            event.scene.sparks.emit(
+                image=choice(damage_images),
+                start_time=now,
+                offset=ppb.Vector(
+                    uniform(-1, 1),
+                    uniform(-1, 1)
+                ),
+                parent=self
+            )
+
+    def interpolate(self, amount: float):
+        """
+        Place the ship ``amount`` of the way from its state before the last
+        update to its state after it.
+        """
+        self.position = self.previous_position * (1 - amount) + self.current_position * amount
+        turn = (self.current_rotation - self.previous_rotation + 180) % 360 - 180
+        self.rotation = self.current_rotation - turn * (1 - amount)
+
+
+
+class MineSprite(ppb.Sprite):
+    """
+    Draws one of a MineField's mines.
+    """
+    image = sprites.region("shock-mine.png")
+    size = 0.25
 
 
+class MineField:
+    """
+    Every live mine, as arrays sorted by height.
 
-class ShockMine(ppb.Sprite):
-    image = ppb.Image("smugglersrun/resources/shock-mine.png")
-    size = 0.25
-    activated = False
-    last_activated = -100
+    Mines are added and evicted a chunk at a time. :meth:`collide` and
+    :meth:`emit` test and set off mines in one pass over the rows near the
+    sprite, and each Update every mine that was set off emits a shockwave.
+    Only the mines found by the last :meth:`cull` are drawn, each by a
+    MineSprite from a pool.
+    """
+    size = MineSprite.size
     CONFIG_COOL_DOWN = 0.5
 
-    def emit(self):
-        now = perf_counter()
-        if not self.activated and now - self.last_activated >= self.CONFIG_COOL_DOWN:
-            self.activated = True
-            self.last_activated = now
+    def __init__(self):
+        self.chunk = np.empty(0, dtype=np.int32)
+        self.id = np.empty(0, dtype=np.int64)
+        self.x = np.empty(0)
+        self.y = np.empty(0)
+        self.last_activated = np.empty(0)
+        self.activated = np.empty(0, dtype=bool)
+        self.visible = np.empty(0, dtype=np.int64)
+        self.drawn: Dict[int, MineSprite] = {}
+        self._pool: List[MineSprite] = []
+        self._next_id = 0
+
+    def __len__(self):
+        return len(self.x)
+
+    @property
+    def sprites(self):
+        return self.drawn.values()
+
+    def _take(self, keep: np.ndarray):
+        self.chunk = self.chunk[keep]
+        self.id = self.id[keep]
+        self.x = self.x[keep]
+        self.y = self.y[keep]
+        self.last_activated = self.last_activated[keep]
+        self.activated = self.activated[keep]
+
+    def add_chunk(self, index: int, positions: List[Tuple[float, float]]):
+        if not positions:
+            return
+        x, y = np.array(positions, dtype=float).T
+        count = len(positions)
+        self.chunk = np.concatenate([self.chunk, np.full(count, index, dtype=np.int32)])
+        self.id = np.concatenate([self.id, np.arange(self._next_id, self._next_id + count)])
+        self.x = np.concatenate([self.x, x])
+        self.y = np.concatenate([self.y, y])
+        self.last_activated = np.concatenate([self.last_activated, np.full(count, -100.0)])
+        self.activated = np.concatenate([self.activated, np.zeros(count, dtype=bool)])
+        self._next_id += count
+        self._take(np.argsort(self.y, kind="stable"))
+
+    def evict_chunk(self, index: int):
+        self._take(self.chunk != index)
+        self._draw(np.intersect1d(self.visible, self.id, assume_unique=True))
+
+    def _rows(self, bottom: float, top: float) -> slice:
+        half = self.size / 2
+        y = self.y
+        return slice(y.searchsorted(bottom - half), y.searchsorted(top + half, "right"))
+
+    def collide(self, sprite: ppb.Sprite) -> np.ndarray:
+        """
+        The indices of the mines touching the sprite, by the same test as
+        :func:`smugglersrun.utils.box_collide`.
+        """
+        rows = self._rows(sprite.bottom, sprite.top)
+        half = self.size / 2
+        x = self.x[rows]
+        y = self.y[rows]
+        touching = (
+            (np.maximum(sprite.right, x + half) - np.minimum(sprite.left, x - half) < sprite.width + self.size)
+            & (np.maximum(sprite.top, y + half) - np.minimum(sprite.bottom, y - half) < sprite.height + self.size)
+        )
+        return rows.start + np.flatnonzero(touching)
+
+    def emit(self, indices: np.ndarray, now: float) -> int:
+        """
+        Set off the given mines, except those already set off or cooling
+        down. Returns how many went off.
+        """
+        ready = indices[~self.activated[indices] & (now - self.last_activated[indices] >= self.CONFIG_COOL_DOWN)]
+        self.activated[ready] = True
+        self.last_activated[ready] = now
+        return len(ready)
+
+    def cull(self, left: float, bottom: float, right: float, top: float):
+        """
+        Draw only the mines overlapping the given rectangle.
+        """
+        rows = self._rows(bottom, top)
+        half = self.size / 2
+        x = self.x[rows]
+        visible = self.id[rows][(x + half >= left) & (x - half <= right)]
+        if not np.array_equal(visible, self.visible):
+            self._draw(visible)
+
+    def _draw(self, visible: np.ndarray):
+        drawn = self.drawn
+        pool = self._pool
+        for mine in np.setdiff1d(self.visible, visible, assume_unique=True).tolist():
+            pool.append(drawn.pop(mine))
+        added = np.setdiff1d(visible, self.visible, assume_unique=True)
+        if len(added):
+            rows = np.flatnonzero(np.isin(self.id, added, assume_unique=True))
+            for mine, x, y in zip(self.id[rows].tolist(), self.x[rows].tolist(), self.y[rows].tolist()):
+                sprite = pool.pop() if pool else MineSprite()
+                sprite.position = ppb.Vector(x, y)
+                drawn[mine] = sprite
+        self.visible = visible
 
     def on_update(self, event, signal):
-        if self.activated:
-            event.scene.add(Shockwave(start_time=perf_counter(), parent=self))
-            self.activated = False
+        activated = np.flatnonzero(self.activated)
+        if not len(activated):
+            return
+        emit = event.scene.shockwaves.emit
+        for x, y in zip(self.x[activated].tolist(), self.y[activated].tolist()):
+            emit(start_time=event.now, parent=None, position=ppb.Vector(x, y))
+        self.activated[activated] = False
 
 
-class TimeDisplay(ppb.RectangleSprite):
+class TimeDisplay(AtlasTextMixin, ppb.RectangleSprite):
     height = 0.5
     time = 0
+    atlas = font.button_atlas
 
     @property
     def image(self):
@@ -238,34 +422,48 @@ class TimeDisplay(ppb.RectangleSprite):
         seconds = floor(self.time % 60)
         fractions = self.time % 1
         result = f"{minutes:02.0f}:{seconds:02.0f}:{fractions * 100:02.0f}"
-        return ppb.Text(result, font=font.button, color=font.color)
+        return self.text_image(result)
 
 
-class Countdown(ppb.Sprite):
+class Countdown(AtlasTextMixin, ppb.Sprite):
     height = 2
     time = 0
+    atlas = font.title_atlas
 
     @property
     def image(self):
-        return ppb.Text(str(int(self.time)), font=font.title, color=font.color)
+        return self.text_image(str(int(self.time)))
 
 
 class Thrust(ppb.Sprite):
-    image = ppb.Image("smugglersrun/resources/fire.png")
+    image = sprites.region("fire.png")
     opacity = 0
     basis = ppb.Vector(0, 1)
 
 
+@dataclass
+class Chunk:
+    index: int
+    beacons: List[ppb.Sprite] = field(default_factory=list)
+
+
 class Sandbox(ppb.BaseScene):
     CONFIG_DENSITY_MODIFER = 3
     CONFIG_PENALTY_START_MULTIPLIER = 5
     CONFIG_PENALTY_OOB_MULTIPLIER = 0.1
     CONFIG_BONUS_TIME = 5
+    CONFIG_CHUNK_SIZE = 20
+    CONFIG_CHUNKS_AHEAD = 2
+    CONFIG_CHUNKS_BEHIND = 1
+    CONFIG_SHOCKWAVE_POOL_SIZE = 16
+    CONFIG_SPARK_POOL_SIZE = 32
+    CONFIG_CULL_MARGIN = 2
+    container_class = IndexedCollection
     remaining_time = 0
     start_timer = 5
     end_timer = 5
 
-    def __init__(self, *, difficulty_level:int = 1, components: dict = None, remaining_time: float = 30):
+    def __init__(self, *, difficulty_level:int = 1, components: Components = None, remaining_time: float = 30, track_length: float = 285, layout: TrackLayout = None):
         super().__init__()
         self.difficulty_level = difficulty_level
         forward = Thrust()
@@ -288,41 +486,184 @@ class Sandbox(ppb.BaseScene):
         if components is not None:
             kwargs["components"] = components
 
-        self.add(Player(**kwargs), tags=["player"])
-
-        for root_y in range(10, 291, 20):
-            chunk_root = ppb.Vector(0, root_y)
-            for _ in range(int(difficulty_level * self.CONFIG_DENSITY_MODIFER)):
-                x = uniform(-10, 10)
-                y = uniform(-10, 10)
-                self.add(ShockMine(position=chunk_root + ppb.Vector(x, y)))
-            for x_pos, y_mod in product((-10, 10), range(-10, 10, 3)):
-                self.add(ppb.Sprite(
-                    image=ppb.Image("smugglersrun/resources/beacon.png"),
-                    position=(x_pos, root_y + y_mod),
-                    size=0.25
-                ))
-        self.add(ppb.RectangleSprite(image=ppb.Image("smugglersrun/resources/finish.png"), position=(0, 285), height=4, width=20, layer=-10), tags=["finish"])
-        self.add(TimeDisplay(time=remaining_time), tags=["timer"])
-        self.add(Countdown(time=self.start_timer), tags=["countdown", "start"])
-        self.add(Countdown(time=self.start_timer), tags=["countdown", "end"])
+        self.player = Player(**kwargs)
+        self.add(self.player, tags=["player"])
+
+        self.transforms = TransformTree()
+        self.add(self.transforms)
+        self.transforms.attach(forward, self.player, (0, -1))
+        self.transforms.attach(retro, self.player, (0, 0.7), rotation=180)
+        self.transforms.attach(tl, self.player, (-0.2, 0.4), rotation=-90)
+        self.transforms.attach(bl, self.player, (-0.7, -0.15), rotation=-90)
+        self.transforms.attach(tr, self.player, (0.2, 0.4), rotation=90)
+        self.transforms.attach(br, self.player, (0.7, -0.15), rotation=90)
+
+        self.shockwaves = ParticleEmitter(
+            Shockwave, self.CONFIG_SHOCKWAVE_POOL_SIZE,
+            overflow=OVERFLOW_DROP,
+            name="shockwave",
+            transforms=self.transforms
+        )
+        self.shockwaves.add_to(self)
+        self.sparks = ParticleEmitter(
+            Shockwave, self.CONFIG_SPARK_POOL_SIZE,
+            name="spark",
+            transforms=self.transforms,
+            max_size=0.25,
+            run_time=0.25
+        )
+        self.sparks.add_to(self)
+
+        if layout is None:
+            layout = self.make_layout(difficulty_level, track_length)
+        self.layout = layout
+        self.next_layout = None
+        self.static = set()
+        self.chunks = {}
+        self.mine_field = MineField()
+        self.add(self.mine_field)
+        self.visible_static = self.static
+        self.counters = {}
+        self.stream_chunks(self.player.position.y)
+
+        self.finish = ppb.RectangleSprite(image=sprites.region("finish.png"), position=(0, layout.track_length), height=4, width=20, layer=-10)
+        self.add_static(self.finish)
+        self.time_display = TimeDisplay(time=remaining_time)
+        self.add(self.time_display, tags=["timer"])
+        self.start_countdown = Countdown(time=self.start_timer)
+        self.add(self.start_countdown, tags=["countdown", "start"])
+        self.end_countdown = Countdown(time=self.start_timer)
+        self.add(self.end_countdown, tags=["countdown", "end"])
         self.remaining_time = remaining_time
-        self.started = perf_counter()
+        self.started = clock.now()
         self.finished = False
 
-        for sound in shock_sounds:
-            sound.volume = 5
-
-    def on_pre_render(self, _, __):
+    @classmethod
+    def make_layout(cls, difficulty_level: int, track_length: float, seed: int = None) -> TrackLayout:
+        return TrackLayout(
+            difficulty_level=difficulty_level,
+            density=cls.CONFIG_DENSITY_MODIFER,
+            track_length=track_length,
+            chunk_size=cls.CONFIG_CHUNK_SIZE,
+            seed=seed
+        )
+
+    def build_chunk(self, index: int) -> Chunk:
+        """
+        Place the mines and beacons for a chunk of track.
+        """
+        layout = self.layout.chunk(index)
+        chunk = Chunk(index)
+        self.mine_field.add_chunk(index, layout.mines)
+        columns = defaultdict(list)
+        for x, y in layout.beacons:
+            columns[x].append((0, y - layout.root_y))
+        for x, offsets in columns.items():
+            strip = beacon_strip(offsets)
+            beacon = ppb.RectangleSprite(
+                image=strip,
+                position=ppb.Vector(x, layout.root_y) + strip.center,
+                width=strip.width,
+                height=strip.height
+            )
+            self.add_static(beacon)
+            chunk.beacons.append(beacon)
+        return chunk
+
+    def evict_chunk(self, chunk: Chunk):
+        self.mine_field.evict_chunk(chunk.index)
+        for beacon in chunk.beacons:
+            self.remove_static(beacon)
+
+    def add_static(self, sprite: ppb.Sprite):
+        """
+        Add a sprite that's drawn but never receives events.
+        """
+        self.static.add(sprite)
+
+    def remove_static(self, sprite: ppb.Sprite):
+        self.static.remove(sprite)
+        if sprite in self.visible_static:
+            self.visible_static.remove(sprite)
+
+    def cull(self):
+        """
+        Find the mines and static sprites within CONFIG_CULL_MARGIN of the
+        camera's view. Only those are drawn.
+        """
+        camera = self.main_camera
+        mine_field = self.mine_field
+        if camera is None:
+            mine_field.cull(-inf, -inf, inf, inf)
+            self.visible_static = list(self.static)
+        else:
+            x, y = camera.position
+            half_width = camera.width / 2 + self.CONFIG_CULL_MARGIN
+            half_height = camera.height / 2 + self.CONFIG_CULL_MARGIN
+            left, right = x - half_width, x + half_width
+            bottom, top = y - half_height, y + half_height
+            mine_field.cull(left, bottom, right, top)
+            self.visible_static = [
+                sprite for sprite in self.static
+                if sprite.right >= left and sprite.left <= right and sprite.top >= bottom and sprite.bottom <= top
+            ]
+        self.counters["culled"] = (
+            len(mine_field) - len(mine_field.drawn) + len(self.static) - len(self.visible_static)
+        )
+
+    def sprite_layers(self):
+        return sorted(chain(self, self.visible_static, self.mine_field.sprites), key=lambda s: getattr(s, "layer", 0))
+
+    def prebuild_next_layout(self):
+        """
+        Start computing the next level's layout on a worker thread.
+
+        Called once the level is won, so the work overlaps the end countdown
+        instead of landing on the frame that replaces the scene.
+        """
+        layout = self.make_layout(self.difficulty_level + 1, self.layout.track_length)
+        self.next_layout = _layout_executor.submit(layout.prebuild)
+
+    def stream_chunks(self, y: float):
+        """
+        Keep only the chunks in a fixed window around the given height live.
+        """
+        current = floor(y / self.CONFIG_CHUNK_SIZE)
+        wanted = range(
+            max(current - self.CONFIG_CHUNKS_BEHIND, 0),
+            min(current + self.CONFIG_CHUNKS_AHEAD + 1, self.layout.chunk_count)
+        )
+        for index in list(self.chunks):
+            if index not in wanted:
+                self.evict_chunk(self.chunks.pop(index))
+        for index in wanted:
+            if index not in self.chunks:
+                self.chunks[index] = self.build_chunk(index)
+
+    def on_scene_stopped(self, event, signal):
+        noise = self.player.components.noise.factories
+        logger.info(
+            "Control noise: %s gradients cached, %s evicted, ~%s KiB",
+            sum(len(factory.gradient) for factory in noise),
+            sum(factory.evictions for factory in noise),
+            sum(factory.gradient_memory() for factory in noise) // 1024,
+        )
+
+    def on_pre_render(self, event, __):
         cam = self.main_camera
-        player = next(self.get(kind=Player))
+        player = self.player
+        player.interpolate(getattr(event, "interpolation", 1))
         cam.position = player.position
+        self.cull()
+        noise = player.components.noise.factories
+        self.counters["noise gradients"] = sum(len(factory.gradient) for factory in noise)
+        self.counters["noise KiB"] = sum(factory.gradient_memory() for factory in noise) // 1024
 
-        time_display: TimeDisplay = next(self.get(kind=TimeDisplay))
+        time_display = self.time_display
         time_display.position = cam.position + ppb.Vector(8, -6)
         time_display.time = self.remaining_time if self.remaining_time > 0 else 0
 
-        countdown = next(self.get(tag="start"))
+        countdown = self.start_countdown
         if self.start_timer > 0:
             countdown.position = cam.position + ppb.Vector(0, 2)
             countdown.time = self.start_timer
@@ -330,7 +671,7 @@ class Sandbox(ppb.BaseScene):
         else:
             countdown.opacity = 0
 
-        countdown = next(self.get(tag="end"))
+        countdown = self.end_countdown
         if (self.finished or self.remaining_time <= 0) and  self.end_timer > 0:
             countdown.position = cam.position + ppb.Vector(0, 2)
             countdown.time = self.end_timer
@@ -339,17 +680,20 @@ class Sandbox(ppb.BaseScene):
             countdown.opacity = 0
 
     def on_update(self, update: ppb.events.Update, signal_event):
-        player:Player = next(self.get(kind=Player))
-        finish = next(self.get(tag="finish"))
+        player = self.player
+        position = player.current_position
+        finish = self.finish
+        self.stream_chunks(position.y)
 
         if self.start_timer > 0:
             self.start_timer -= update.time_delta
-            if player.position.y >= 5:
+            if position.y >= 5:
                 self.remaining_time -= update.time_delta * self.CONFIG_PENALTY_START_MULTIPLIER
         elif not self.finished and self.remaining_time > 0:
-            if player.position.y >= finish.position.y:
+            if position.y >= finish.position.y:
                 self.finished = True
-            elif -11 <= player.position.x <= 11:
+                self.prebuild_next_layout()
+            elif -11 <= position.x <= 11:
                 self.remaining_time -= update.time_delta * self.CONFIG_PENALTY_OOB_MULTIPLIER
             self.remaining_time -= update.time_delta
         elif self.end_timer > 0:
@@ -365,6 +709,7 @@ class Sandbox(ppb.BaseScene):
                             "difficulty_level": self.difficulty_level + 1,
                             "components": player.components,
                             "remaining_time": self.remaining_time + self.difficulty_level * self.CONFIG_BONUS_TIME,
+                            "layout": self.next_layout.result(),
                         }
                     )
                 )
@@ -0,0 +1,65 @@
+from dataclasses import dataclass
+from dataclasses import field
+from itertools import product
+from math import ceil
+from random import Random
+from random import getrandbits
+from typing import Dict, Iterable, List, Tuple
+
+Position = Tuple[float, float]
+
+
+@dataclass
+class ChunkLayout:
+    index: int
+    root_y: float
+    mines: List[Position] = field(default_factory=list)
+    beacons: List[Position] = field(default_factory=list)
+
+
+class TrackLayout:
+    """
+    Where the mines and beacons of a level go, without any sprites.
+
+    Chunks are computed on demand and memoized. Each chunk draws from its own
+    generator seeded from the track seed, so the order chunks are computed in
+    doesn't change the result. That makes it safe to compute some or all of
+    a layout on another thread with :meth:`prebuild`.
+    """
+
+    def __init__(self, *, difficulty_level: int, density: float, track_length: float,
+                 chunk_size: int = 20, seed: int = None):
+        self.difficulty_level = difficulty_level
+        self.density = density
+        self.track_length = track_length
+        self.chunk_size = chunk_size
+        self.chunk_count = ceil((track_length + chunk_size / 2) / chunk_size)
+        self.seed = getrandbits(32) if seed is None else seed
+        self.chunks: Dict[int, ChunkLayout] = {}
+
+    def chunk(self, index: int) -> ChunkLayout:
+        try:
+            return self.chunks[index]
+        except KeyError:
+            chunk = self.chunks[index] = self._generate(index)
+            return chunk
+
+    def prebuild(self, indices: Iterable[int] = None) -> 'TrackLayout':
+        if indices is None:
+            indices = range(self.chunk_count)
+        for index in indices:
+            self.chunk(index)
+        return self
+
+    def _generate(self, index: int) -> ChunkLayout:
+        half = self.chunk_size / 2
+        rng = Random(self.seed + index)
+        root_y = index * self.chunk_size + half
+        chunk = ChunkLayout(index, root_y)
+        for _ in range(int(self.difficulty_level * self.density)):
+            x = rng.uniform(-half, half)
+            y = rng.uniform(-half, half)
+            chunk.mines.append((x, root_y + y))
+        for x_pos, y_mod in product((-half, half), range(-int(half), int(half), 3)):
+            chunk.beacons.append((x_pos, root_y + y_mod))
+        return chunk
@@ -1,5 +1,3 @@
-from time import perf_counter
-
 from ppb import BaseScene
 from ppb import Image
 from ppb import Font
@@ -9,6 +7,8 @@ from ppb import Vector
 from ppb.events import ReplaceScene
 from ppb.sprites import RectangleSprite
 
+from smugglersrun import clock
+
 
 text_opacity = int(255 * 0.8)
 
@@ -55,9 +55,9 @@ class Splash(BaseScene):
         self.add(name)
         self.add(game)
         self.add(icon)
-        self.start = perf_counter()
+        self.start = clock.now()
         self.next_scene = next_scene
 
     def on_idle(self, event, signal):
-        if perf_counter() >= self.start + self.run_time and self.next_scene:
+        if event.now >= self.start + self.run_time and self.next_scene:
             signal(ReplaceScene(self.next_scene()))
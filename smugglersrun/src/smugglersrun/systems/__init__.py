@@ -1,2 +1,9 @@
-from smugglersrun.systems.controller import Controls, Controller
-from smugglersrun.systems.bgm import BackgroundMusic, BackgroundMusicController, QueueBackgroundMusic
\ No newline at end of file
+from smugglersrun.systems.controller import CONTROL_NAMES, Controls, Controller
+from smugglersrun.systems.bgm import BackgroundMusic, BackgroundMusicController, QueueBackgroundMusic
+from smugglersrun.systems.hitches import HitchMonitor
+from smugglersrun.systems.profiler import Profiler
+from smugglersrun.systems.frame_clock import FrameClock
+from smugglersrun.systems.renderer import AtlasRenderer
+from smugglersrun.systems.sound_bank import SoundBankController, SoundEffect
+from smugglersrun.systems.prefetch import Prefetcher
+from smugglersrun.systems.fixed_update import FixedUpdater
@@ -1,17 +1,30 @@
+import ctypes
 import io
+import mmap
+import threading
 from collections import deque
 from dataclasses import dataclass
 
 from ppb import assetlib
+from ppb import vfs
 from ppb.systems._sdl_utils import mix_call
-from ppb.systems.sound import SoundController
+from ppb.systems._sdl_utils import sdl_call
+from sdl2 import SDL_FreeRW
+from sdl2 import SDL_RWFromConstMem
 from sdl2 import rw_from_object
+from sdl2.sdlmixer import Mix_FadeInMusic
+from sdl2.sdlmixer import Mix_FadeOutMusic
 from sdl2.sdlmixer import Mix_FreeMusic
+from sdl2.sdlmixer import Mix_HaltMusic
+from sdl2.sdlmixer import Mix_HookMusicFinished
 from sdl2.sdlmixer import Mix_LoadMUS_RW
 from sdl2.sdlmixer import MIX_MAX_VOLUME
+from sdl2.sdlmixer import Mix_MusicDuration
 from sdl2.sdlmixer import Mix_PlayMusic
-from sdl2.sdlmixer import Mix_PlayingMusic
 from sdl2.sdlmixer import Mix_VolumeMusic
+from sdl2.sdlmixer import music_finished
+
+from smugglersrun.systems.sound_bank import SoundBankController
 
 
 @dataclass
@@ -27,6 +40,12 @@ class SetMusicVolume:
 class BackgroundMusic(assetlib.Asset):
     """
     A ppb asset that wraps a SDL MIX_MUSIC pointer.
+
+    The music file isn't read into memory. SDL_mixer decodes music as it
+    plays, so it's given an RWops over the file instead: a private memory
+    map when the file is on disk, which the OS pages in as the mixer reads
+    it, or the open file itself otherwise. Either stays open until the music
+    is freed.
     """
 
     def __new__(cls, name, *, play_forever=False, play_loops=1):
@@ -40,41 +59,134 @@ class BackgroundMusic(assetlib.Asset):
         :param play_loops: If not play_forever, the number of times to loop the
            track. Defaults to 1.
         """
-        super().__init__(name)
         self._file = None
+        self._map = None
+        self._buffer = None
+        self._rw = None
         if play_forever:
             self.loops = -1
         else:
             self.loops = play_loops
+        super().__init__(name)
 
-    def background_parse(self, data: bytes):
-        self._file = rw_from_object(io.BytesIO(data))
-
-        rv = mix_call(
-            Mix_LoadMUS_RW, self._file, _check_error=lambda rv: not rv
+    def _background(self):
+        # Called in background thread
+        self._file = vfs.open(self.name)
+        try:
+            fileno = self._file.fileno()
+        except (AttributeError, io.UnsupportedOperation):
+            self._rw = rw_from_object(self._file)
+        else:
+            # ACCESS_COPY so ctypes can take the buffer; nothing writes to it.
+            self._map = mmap.mmap(fileno, 0, access=mmap.ACCESS_COPY)
+            self._buffer = (ctypes.c_char * len(self._map)).from_buffer(self._map)
+            self._rw = sdl_call(
+                SDL_RWFromConstMem, self._buffer, len(self._map),
+                _check_error=lambda rv: not rv
+            )
+
+        return mix_call(
+            Mix_LoadMUS_RW, self._rw, 0, _check_error=lambda rv: not rv
         )
-        return rv
 
-    def free(self, object, _Mix_FreeMusic=Mix_FreeMusic):
+    def free(self, object, _Mix_FreeMusic=Mix_FreeMusic, _SDL_FreeRW=SDL_FreeRW):
         if object:
             _Mix_FreeMusic(object)
+        if self._map is not None:
+            _SDL_FreeRW(self._rw)
+            self._buffer = None
+            self._map.close()
+        if self._file is not None:
+            self._file.close()
 
 
-class BackgroundMusicController(SoundController):
+@music_finished
+def _filler_music_finished():
+    pass
 
-    def __init__(self, **kwargs):
+
+class BackgroundMusicController(SoundBankController):
+    """
+    Plays queued background music in order, and sound effects through the
+    sound bank.
+
+    SDL_mixer calls back when a track finishes and the next queued track
+    starts on the following idle, so idle ticks don't poll the mixer. A
+    queued track starts loading when it's queued, so it's ready by the time
+    the track before it ends. A track that plays forever gives way to the
+    next queued track once that has loaded.
+
+    With ``music_fade`` set, in seconds, the outgoing track fades out before
+    a queued track and every track fades in. SDL_mixer plays one music
+    stream at a time, so the fades follow each other instead of overlapping.
+    """
+    _music_finished_callback = None
+
+    def __init__(self, *, music_fade: float = 0, **kwargs):
         super().__init__(**kwargs)
+        self.music_fade = music_fade
+        self.bgm_current = None
         self.bgm_currently_playing = None
         self.bgm_queue = deque()
+        self.fade_out_at = None
+        self._music_finished = threading.Event()
+
+    def __enter__(self):
+        super().__enter__()
+        self._music_finished_callback = music_finished(self._on_music_finished)
+        mix_call(Mix_HookMusicFinished, self._music_finished_callback)
+
+    def __exit__(self, *exc):
+        mix_call(Mix_HookMusicFinished, _filler_music_finished)
+        self._music_finished_callback = None
+        super().__exit__(*exc)
+
+    def _on_music_finished(self):
+        # "NEVER call SDL_Mixer functions, nor SDL_LockAudio, from a callback function."
+        self._music_finished.set()
 
     def on_queue_background_music(self, event: QueueBackgroundMusic, signal):
-        self.bgm_queue.append(event.background_music)
+        music = event.background_music
+        if music is self.bgm_current and music.loops == -1 and not self.bgm_queue:
+            return
+        prefetch = getattr(music, "prefetch", None)
+        if prefetch is not None:
+            prefetch()
+        self.bgm_queue.append(music)
 
     def on_scene_started(self, event, signal):
         mix_call(Mix_VolumeMusic, 20)
 
     def on_idle(self, event, signal):
-        if not mix_call(Mix_PlayingMusic) and self.bgm_queue:
-            _next: BackgroundMusic = self.bgm_queue.popleft()
-            self.bgm_currently_playing = _next.load()
+        if self._music_finished.is_set():
+            self._music_finished.clear()
+            self.bgm_current = None
+            self.bgm_currently_playing = None
+            self.fade_out_at = None
+
+        if not self.bgm_queue or not self.bgm_queue[0].is_loaded():
+            return
+        if self.bgm_current is None:
+            self.play_next(event.now)
+        elif self.fade_out_at is not None and event.now >= self.fade_out_at:
+            self.fade_out_at = None
+            if self.music_fade:
+                mix_call(Mix_FadeOutMusic, int(self.music_fade * 1000))
+            else:
+                mix_call(Mix_HaltMusic)
+
+    def play_next(self, now: float):
+        _next: BackgroundMusic = self.bgm_queue.popleft()
+        self.bgm_current = _next
+        self.bgm_currently_playing = _next.load()
+        if self.music_fade:
+            mix_call(Mix_FadeInMusic, self.bgm_currently_playing, _next.loops, int(self.music_fade * 1000))
+        else:
             mix_call(Mix_PlayMusic, self.bgm_currently_playing, _next.loops)
+
+        if _next.loops == -1:
+            self.fade_out_at = now
+        elif self.music_fade:
+            duration = mix_call(Mix_MusicDuration, self.bgm_currently_playing)
+            if duration > 0:
+                self.fade_out_at = now + duration * _next.loops - self.music_fade
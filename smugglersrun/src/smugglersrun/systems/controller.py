@@ -1,4 +1,7 @@
 from dataclasses import dataclass
+from dataclasses import fields
+from dataclasses import replace
+from typing import Dict, Tuple, Type
 
 from ppb import GameEngine
 from ppb import events
@@ -6,7 +9,7 @@ from ppb import keycodes
 from ppb import systemslib
 
 
-@dataclass
+@dataclass(frozen=True)
 class Controls:
     forward: bool
     backwards: bool
@@ -16,52 +19,55 @@ class Controls:
     rotate_right: bool
 
 
+NEUTRAL = Controls(False, False, False, False, False, False)
+CONTROL_NAMES = tuple(field.name for field in fields(Controls))
+
+default_bindings = {
+    keycodes.W: "forward",
+    keycodes.S: "backwards",
+    keycodes.A: "left",
+    keycodes.D: "right",
+    keycodes.Q: "rotate_left",
+    keycodes.E: "rotate_right",
+}
+
+
 class Controller(systemslib.System):
-    forward: bool = False
-    backwards: bool = False
-    left: bool = False
-    right: bool = False
-    rotate_left: bool = False
-    rotate_right: bool = False
+    """
+    Tracks the player's controls and attaches them to update events.
 
-    def __init__(self, *, engine: GameEngine, **kwargs):
+    ``controls`` is an immutable snapshot that's only replaced when a bound
+    key changes it, so every update between input changes shares one
+    object. ``bindings`` maps keys to Controls fields; use :meth:`bind` to
+    change them.
+    """
+    control_events: Tuple[Type, ...] = (events.Update,)
+
+    def __init__(self, *, engine: GameEngine, bindings: Dict[keycodes.KeyCode, str] = None, **kwargs):
         super().__init__(engine=engine, **kwargs)
-        engine.register(..., self.add_controls)
+        self.controls = NEUTRAL
+        self.bindings = dict(default_bindings if bindings is None else bindings)
+        for event_type in self.control_events:
+            engine.register(event_type, self.add_controls)
+
+    def bind(self, key: keycodes.KeyCode, control: str):
+        if not hasattr(NEUTRAL, control):
+            raise ValueError(f"Unknown control {control!r}.")
+        self.bindings[key] = control
 
     def add_controls(self, event):
-        event.controls = Controls(
-            self.forward,
-            self.backwards,
-            self.left,
-            self.right,
-            self.rotate_left,
-            self.rotate_right
-        )
+        event.controls = self.controls
+
+    def set_control(self, control: str, value: bool):
+        if getattr(self.controls, control) is not value:
+            self.controls = replace(self.controls, **{control: value})
 
     def on_key_pressed(self, event: events.KeyPressed, signal):
-        if event.key is keycodes.W:
-            self.forward = True
-        elif event.key is keycodes.S:
-            self.backwards = True
-        elif event.key is keycodes.A:
-            self.left = True
-        elif event.key is keycodes.D:
-            self.right = True
-        elif event.key is keycodes.Q:
-            self.rotate_left = True
-        elif event.key is keycodes.E:
-            self.rotate_right = True
+        control = self.bindings.get(event.key)
+        if control is not None:
+            self.set_control(control, True)
 
     def on_key_released(self, event: events.KeyReleased, signal):
-        if event.key is keycodes.W:
-            self.forward = False
-        elif event.key is keycodes.S:
-            self.backwards = False
-        elif event.key is keycodes.A:
-            self.left = False
-        elif event.key is keycodes.D:
-            self.right = False
-        elif event.key is keycodes.Q:
-            self.rotate_left = False
-        elif event.key is keycodes.E:
-            self.rotate_right = False
+        control = self.bindings.get(event.key)
+        if control is not None:
+            self.set_control(control, False)
@@ -0,0 +1,72 @@
+import logging
+
+from ppb import GameEngine
+from ppb import events
+from ppb.systemslib import System
+
+logger = logging.getLogger(__name__)
+
+
+class FixedUpdater(System):
+    """
+    Signals Updates at a fixed ``update_rate`` per second, apart from rendering.
+
+    Every Idle adds the time since the last one to an accumulator and signals
+    an Update for each whole step it holds, up to ``max_updates``. Any whole
+    steps past that are dropped, so a slow frame slows the game down rather
+    than making the next frame slower still catching up. Each PreRender is
+    stamped with ``interpolation``: how far the leftover time is into the
+    next step, for drawing between the last two updates.
+
+    Updates carry the simulated time as ``now``, which advances by one step
+    per Update signalled, so dropped steps don't move the game's clock on.
+    PreRender's ``now`` is the simulated time plus the leftover time.
+
+    Reads the frame's time from FrameClock. List it before the renderer in
+    ``basic_systems`` so a frame's Updates run before it's drawn.
+    """
+
+    def __init__(self, *, engine: GameEngine, update_rate: float = 62.5, max_updates: int = 5, **kwargs):
+        super().__init__(engine=engine, **kwargs)
+        self.time_step = 1 / update_rate
+        self.max_updates = max_updates
+        self.accumulated_time = 0
+        self.last_tick = None
+        self.sim_time = None
+        self.updates = 0
+        self.dropped_updates = 0
+        self.capped_frames = 0
+        engine.register(events.PreRender, self.stamp)
+
+    def __exit__(self, *exc):
+        logger.info(
+            "Fixed updates: %d run, %d dropped over %d capped frames",
+            self.updates, self.dropped_updates, self.capped_frames
+        )
+
+    def stamp(self, event):
+        event.interpolation = self.accumulated_time / self.time_step
+        if self.sim_time is not None:
+            event.now = self.sim_time + self.accumulated_time
+
+    def on_idle(self, event, signal):
+        now = event.now
+        if self.last_tick is None:
+            self.last_tick = self.sim_time = now
+        self.accumulated_time += now - self.last_tick
+        self.last_tick = now
+
+        updates = 0
+        while self.accumulated_time >= self.time_step:
+            if updates == self.max_updates:
+                self.dropped_updates += int(self.accumulated_time // self.time_step)
+                self.accumulated_time %= self.time_step
+                self.capped_frames += 1
+                break
+            self.accumulated_time -= self.time_step
+            self.sim_time += self.time_step
+            update = events.Update(self.time_step)
+            update.now = self.sim_time
+            signal(update)
+            updates += 1
+        self.updates += updates
@@ -0,0 +1,31 @@
+from ppb import GameEngine
+from ppb import events
+from ppb.systemslib import System
+
+from smugglersrun import clock
+
+
+class FrameClock(System):
+    """
+    Reads the clock once per frame and stamps it on the frame's events.
+
+    The time is sampled when Idle is published and shared as ``event.now``
+    by that Idle and every stamped event after it, so all handlers in a
+    frame agree on the time. Events signalled with a ``now`` of their own,
+    like FixedUpdater's Updates, keep it. Use
+    :func:`smugglersrun.clock.set_source` to run on a virtual clock.
+    """
+    stamped_events = (events.Idle, events.Update, events.PreRender, events.Render)
+
+    def __init__(self, *, engine: GameEngine, **kwargs):
+        super().__init__(engine=engine, **kwargs)
+        self.now = clock.now()
+        for event_type in self.stamped_events:
+            engine.register(event_type, self.stamp)
+
+    def stamp(self, event):
+        if type(event) is events.Idle:
+            self.now = clock.now()
+        elif hasattr(event, "now"):
+            return
+        event.now = self.now
@@ -0,0 +1,85 @@
+import logging
+from collections import deque
+from dataclasses import dataclass
+
+from ppb.systemslib import System
+from ppb.utils import get_time
+
+import smugglersrun
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Transition:
+    scene: str
+    time: float
+    longest_before: float
+    longest_after: float = 0
+
+    @property
+    def longest_frame(self):
+        return max(self.longest_before, self.longest_after)
+
+
+class HitchMonitor(System):
+    """
+    Measures the time to the first frame and the longest frame around each
+    scene transition.
+
+    The first frame is timed from ``started``, by default when the
+    smugglersrun package was imported, to the end of the first Render; it's
+    recorded in ``first_frame`` and logged. Frame length is the time between
+    Idle events. The longest frame in the window before a scene starts and
+    the window after it are logged once the window closes. The last
+    ``hitch_history`` transitions are kept in ``transitions``;
+    ``transition_count`` and ``worst_transition`` cover the whole session.
+    """
+
+    def __init__(self, *, hitch_window: float = 1, hitch_history: int = 32, started: float = None, **kwargs):
+        super().__init__(**kwargs)
+        self.hitch_window = hitch_window
+        self.started = smugglersrun.started if started is None else started
+        self.first_frame = None
+        self.recent_frames = deque()
+        self.pending = []
+        self.transitions = deque(maxlen=hitch_history)
+        self.transition_count = 0
+        self.worst_transition = None
+
+    def on_render(self, event, signal):
+        if self.first_frame is None:
+            self.first_frame = get_time() - self.started
+            logger.info("First frame %.1f ms after start", self.first_frame * 1000)
+
+    def on_idle(self, event, signal):
+        now = get_time()
+        frames = self.recent_frames
+        frames.append((now, event.time_delta))
+        while frames[0][0] < now - self.hitch_window:
+            frames.popleft()
+
+        while self.pending and now - self.pending[0].time >= self.hitch_window:
+            transition = self.pending.pop(0)
+            self.transitions.append(transition)
+            self.transition_count += 1
+            worst = self.worst_transition
+            if worst is None or transition.longest_frame > worst.longest_frame:
+                self.worst_transition = transition
+            logger.info(
+                "Transition to %s: longest frame %.1f ms (%.1f ms before, %.1f ms after)",
+                transition.scene,
+                transition.longest_frame * 1000,
+                transition.longest_before * 1000,
+                transition.longest_after * 1000,
+            )
+        for transition in self.pending:
+            if event.time_delta > transition.longest_after:
+                transition.longest_after = event.time_delta
+
+    def on_scene_started(self, event, signal):
+        self.pending.append(Transition(
+            scene=type(event.scene).__name__,
+            time=get_time(),
+            longest_before=max((length for _, length in self.recent_frames), default=0),
+        ))
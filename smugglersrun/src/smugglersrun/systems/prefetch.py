@@ -0,0 +1,22 @@
+from ppb.systemslib import System
+
+from smugglersrun import assets
+
+
+class Prefetcher(System):
+    """
+    Prefetches the asset manifest once the first scene has started.
+
+    The first scene's own assets are already queued by then, so they load
+    first, and everything later scenes need loads while it's on screen.
+    """
+
+    def __init__(self, *, manifest: assets.Manifest = assets.manifest, **kwargs):
+        super().__init__(**kwargs)
+        self.manifest = manifest
+        self.prefetched = False
+
+    def on_scene_started(self, event, signal):
+        if not self.prefetched:
+            self.prefetched = True
+            self.manifest.prefetch()
@@ -0,0 +1,284 @@
+import json
+import logging
+from collections import defaultdict
+from collections import deque
+from functools import wraps
+from time import perf_counter
+from typing import Deque, Dict, List, Tuple
+
+import ppb
+from ppb.systemslib import System
+from ppb.utils import camel_to_snake
+from ppb.utils import get_time
+
+from smugglersrun import font
+from smugglersrun.glyphs import AtlasTextMixin
+
+logger = logging.getLogger(__name__)
+
+FRAME = "frame"
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    return ordered[round(fraction * (len(ordered) - 1))]
+
+
+class OverlayLine(AtlasTextMixin, ppb.RectangleSprite):
+    height = 0.4
+    width = 12
+    layer = 1000
+    text = ""
+    line = 0
+    atlas = font.button_atlas
+
+    @property
+    def image(self):
+        if not self.text:
+            return None
+        return self.text_image(self.text)
+
+    def on_pre_render(self, event, signal):
+        self.position = event.scene.main_camera.position + ppb.Vector(-6, 6.5 - self.line * self.height)
+
+
+class TimedHandlers:
+    """
+    Stands in for an object while an event is published, timing its handlers.
+
+    Subclassed per type with the type's name, so ppb's errors about a
+    handler name the real class.
+    """
+    __slots__ = ("target", "profiler")
+
+    def __init__(self, target, profiler: "Profiler"):
+        self.target = target
+        self.profiler = profiler
+
+    def __getattr__(self, name):
+        method = getattr(self.target, name, None)
+        if not callable(method):
+            return method
+        record = self.profiler.record
+        record_name = self.profiler.handler_name(self.target, name)
+
+        def timed(event, signal):
+            start = perf_counter()
+            try:
+                method(event, signal)
+            finally:
+                record(record_name, type(event).__name__, start, perf_counter())
+        timed.__wrapped__ = method  # ppb checks the handler's signature when it raises TypeError.
+        return timed
+
+
+class Profiler(System):
+    """
+    Times every event handler and event extension the engine calls.
+
+    Wraps the engine's publish to time each event, its extensions and the
+    objects it walks, leaving ppb to do the publishing. Each handler's time is
+    summed over a frame, and the last ``profile_frames`` frames are kept per
+    handler for the overlay's rolling p50/p99. Every
+    call is also kept as a span in a ring buffer of ``profile_spans``, which
+    is written to ``profile_trace``, if given, as a Chrome trace
+    (chrome://tracing or https://ui.perfetto.dev) when the engine exits.
+
+    ppb publishes Idle every time round its loop but only draws some of
+    them, so a frame runs from the first Idle after one PreRender to the
+    first Idle after the next.
+
+    ``totals`` keeps the call count and total seconds of each handler for
+    the whole run.
+
+    A scene can also report per-frame counts by putting them in a
+    ``counters`` dict. They're sampled at the end of every frame, shown on
+    the overlay, written to the trace as counter tracks and summed in
+    ``counter_totals``.
+    """
+    CONFIG_OVERLAY_LINES = 12
+    CONFIG_OVERLAY_REFRESH = 0.5
+
+    def __init__(self, *, engine, profile_frames: int = 300, profile_spans: int = 200_000,
+                 profile_trace: str = None, profile_overlay: bool = True, **kwargs):
+        super().__init__(**kwargs)
+        self.engine = engine
+        self.trace_path = profile_trace
+        self.samples: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=profile_frames))
+        self.spans: Deque[Tuple[str, str, float, float]] = deque(maxlen=profile_spans)
+        self.totals: Dict[str, List[float]] = defaultdict(lambda: [0, 0.0])
+        self.frame: Dict[str, float] = defaultdict(float)
+        self.counter_samples: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=profile_frames))
+        self.counter_totals: Dict[str, List[float]] = defaultdict(lambda: [0, 0.0])
+        self.frame_start = None
+        self.drawn = False
+        self.names = {}
+        self.proxies = {}
+        self.category = None
+        self.event_handler_name = ""
+        self.event_handler_names = {}
+        self.overlay = [OverlayLine(line=line) for line in range(self.CONFIG_OVERLAY_LINES)] if profile_overlay else []
+        self.overlay_updated = 0
+        self.engine_publish = engine.publish
+        self.engine_walk = engine.walk
+        self.engine_register = engine.register
+        for callbacks in engine.event_extensions.values():
+            callbacks[:] = [self.timed_extension(callback) for callback in callbacks]
+        engine.publish = self.publish
+        engine.walk = self.walk
+        engine.register = self.register
+
+    def __exit__(self, *exc):
+        if self.trace_path:
+            self.dump_trace(self.trace_path)
+
+    def handler_name(self, obj, handler) -> str:
+        key = (type(obj), handler)
+        try:
+            return self.names[key]
+        except KeyError:
+            name = self.names[key] = f"{type(obj).__name__}.{handler}"
+            return name
+
+    def record(self, name: str, category: str, start: float, end: float):
+        duration = end - start
+        self.frame[name] += duration
+        total = self.totals[name]
+        total[0] += 1
+        total[1] += duration
+        self.spans.append((name, category, start, duration))
+
+    def timed_extension(self, callback):
+        record = self.record
+        name = callback.__qualname__
+
+        @wraps(callback)
+        def timed(event):
+            start = perf_counter()
+            try:
+                callback(event)
+            finally:
+                record(name, self.category, start, perf_counter())
+        return timed
+
+    def register(self, event_type, callback):
+        self.engine_register(event_type, callback)
+        callbacks = self.engine.event_extensions[event_type]
+        callbacks[-1] = self.timed_extension(callbacks[-1])
+
+    def walk(self):
+        proxies = self.proxies
+        event_handler_name = self.event_handler_name
+        for obj in self.engine_walk():
+            if not callable(getattr(obj, event_handler_name, None)):
+                yield obj
+                continue
+            object_type = type(obj)
+            try:
+                proxy = proxies[object_type]
+            except KeyError:
+                proxy = proxies[object_type] = type(object_type.__name__, (TimedHandlers,), {"__slots__": ()})
+            yield proxy(obj, self)
+
+    def publish(self):
+        event_type = type(self.engine.events[0])
+        if event_type is ppb.events.PreRender:
+            self.drawn = True
+        elif event_type is ppb.events.Idle and self.drawn:
+            self.drawn = False
+            self.end_frame()
+        category = self.category = event_type.__name__
+        try:
+            self.event_handler_name = self.event_handler_names[event_type]
+        except KeyError:
+            self.event_handler_name = self.event_handler_names[event_type] = f"on_{camel_to_snake(category)}"
+        start = perf_counter()
+        try:
+            self.engine_publish()
+        finally:
+            self.record(category, category, start, perf_counter())
+
+    def end_frame(self):
+        now = perf_counter()
+        if self.frame_start is not None:
+            self.frame[FRAME] = now - self.frame_start
+        self.frame_start = now
+        samples = self.samples
+        for name, duration in self.frame.items():
+            samples[name].append(duration)
+        self.frame.clear()
+
+        counters = getattr(self.engine.current_scene, "counters", None)
+        if counters:
+            for name, value in counters.items():
+                self.counter_samples[name].append(value)
+                total = self.counter_totals[name]
+                total[0] += 1
+                total[1] += value
+                self.spans.append((name, None, now, value))
+
+    def summary(self) -> List[Tuple[str, float, float]]:
+        """
+        The name, p50 and p99 per-frame seconds of every handler, slowest p99
+        first.
+        """
+        rows = []
+        for name, durations in self.samples.items():
+            ordered = sorted(durations)
+            rows.append((name, percentile(ordered, 0.5), percentile(ordered, 0.99)))
+        rows.sort(key=lambda row: row[2], reverse=True)
+        return rows
+
+    def counter_summary(self) -> List[Tuple[str, float, float]]:
+        rows = []
+        for name, values in self.counter_samples.items():
+            ordered = sorted(values)
+            rows.append((name, percentile(ordered, 0.5), percentile(ordered, 0.99)))
+        return rows
+
+    def on_scene_started(self, event, signal):
+        for line in self.overlay:
+            event.scene.add(line, tags=["profiler"])
+
+    def on_idle(self, event, signal):
+        if not self.overlay:
+            return
+        now = get_time()
+        if now - self.overlay_updated < self.CONFIG_OVERLAY_REFRESH:
+            return
+        self.overlay_updated = now
+        lines = iter(self.overlay)
+        for (name, p50, p99), line in zip(self.counter_summary(), lines):
+            line.text = f"{name}  p50 {p50:g}  p99 {p99:g}"
+        next(lines).text = "handler  p50 ms  p99 ms"
+        rows = iter(self.summary())
+        for line in lines:
+            name, p50, p99 = next(rows, ("", 0, 0))
+            line.text = name and f"{name}  {p50 * 1000:.2f}  {p99 * 1000:.2f}"
+
+    def dump_trace(self, path: str):
+        trace = {
+            "traceEvents": [
+                {
+                    "name": name,
+                    "cat": category,
+                    "ph": "X",
+                    "ts": start * 1e6,
+                    "dur": duration * 1e6,
+                    "pid": 0,
+                    "tid": 0,
+                }
+                if category is not None else
+                {
+                    "name": name,
+                    "ph": "C",
+                    "ts": start * 1e6,
+                    "args": {name: duration},
+                    "pid": 0,
+                }
+                for name, category, start, duration in self.spans
+            ],
+            "displayTimeUnit": "ms",
+        }
+        with open(path, "w") as trace_file:
+            json.dump(trace, trace_file)
+        logger.info("Wrote %s spans to %s", len(self.spans), path)
@@ -0,0 +1,37 @@
+import ctypes
+
+from ppb.systems import Renderer
+from sdl2 import SDL_Rect
+
+
+class AtlasRenderer(Renderer):
+    """
+    A Renderer that draws atlas regions.
+
+    An AtlasRegion loads as its whole atlas surface, so every region shares
+    one texture; this copies just the region's rectangle of it, sized as if
+    the region were the whole image.
+    """
+
+    def compute_rectangles(self, texture, game_object, camera):
+        region = getattr(game_object.__image__(), "region", None)
+        if region is None:
+            return super().compute_rectangles(texture, game_object, camera)
+
+        if hasattr(game_object, 'width'):
+            obj_w = game_object.width
+            obj_h = game_object.height
+        else:
+            obj_w, obj_h = game_object.size
+
+        win_w, win_h = self.target_resolution(region.w, region.h, obj_w, obj_h, camera.pixel_ratio)
+
+        center = camera.translate_point_to_screen(game_object.position)
+        dest_rect = SDL_Rect(
+            x=int(center.x - win_w / 2),
+            y=int(center.y - win_h / 2),
+            w=win_w,
+            h=win_h,
+        )
+
+        return region, dest_rect, ctypes.c_double(-game_object.rotation)
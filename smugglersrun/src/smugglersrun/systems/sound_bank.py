@@ -0,0 +1,167 @@
+"""
+Sound effects played from a fixed pool of mixer channels.
+
+A :class:`SoundEffect` is a sound with limits on how it may play. Declare
+effects in the asset manifest so they're decoded once, in the background,
+at startup. :class:`SoundBankController` plays them on PlaySound without ever
+waiting on a load, and keeps track of every channel it uses.
+"""
+import itertools
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict
+
+import ppb
+from ppb.assetlib import AbstractAsset
+from ppb.systems._sdl_utils import mix_call
+from ppb.systems.sound import SoundController
+from sdl2.sdlmixer import Mix_HaltChannel
+from sdl2.sdlmixer import Mix_PlayChannel
+from sdl2.sdlmixer import Mix_Playing
+
+logger = logging.getLogger(__name__)
+
+
+class SoundEffect(AbstractAsset):
+    """
+    A sound that plays at most ``voices`` times at once.
+
+    When the channel pool is full, a sound takes the channel of a playing
+    sound with a lower ``priority``. The sound isn't decoded until it's
+    loaded or prefetched.
+    """
+
+    def __init__(self, name: str, *, voices: int = 1, priority: int = 0):
+        self.name = name
+        self.voices = voices
+        self.priority = priority
+        self._sound = None
+
+    def __repr__(self):
+        return f"<{type(self).__name__} name={self.name!r} voices={self.voices} priority={self.priority} at 0x{id(self):x}>"
+
+    @property
+    def sound(self) -> ppb.Sound:
+        if self._sound is None:
+            self._sound = ppb.Sound(self.name)
+        return self._sound
+
+    def prefetch(self):
+        self.sound
+
+    def load(self, timeout: float = None):
+        return self.sound.load(timeout)
+
+    def is_loaded(self):
+        return self._sound is not None and self._sound.is_loaded()
+
+
+@dataclass
+class Voice:
+    sound: AbstractAsset
+    priority: int
+    started: int
+
+
+@dataclass
+class SoundStats:
+    played: int = 0
+    stolen: int = 0
+    over_voice_limit: int = 0
+    no_channel: int = 0
+    not_loaded: int = 0
+    peak_channels: int = 0
+
+
+class SoundBankController(SoundController):
+    """
+    Plays sounds on a pool of ``sound_channels`` mixer channels.
+
+    A sound that hasn't finished loading is skipped rather than waited for,
+    and starts loading if it hadn't. A SoundEffect already playing on
+    ``voices`` channels is skipped. When every channel is busy, the oldest
+    of the lowest priority sounds below the new one is stopped to make room;
+    if there isn't one, the new sound is skipped. Plain ppb Sounds play with
+    no voice limit at priority 0.
+
+    ``voices`` maps busy channels to what's playing on them and ``stats``
+    counts every outcome; both are logged when the controller exits.
+    """
+
+    def __init__(self, *, sound_channels: int = 16, **kwargs):
+        super().__init__(**kwargs)
+        self.sound_channels = sound_channels
+        self.voices: Dict[int, Voice] = {}
+        self.stats = SoundStats()
+        self._finished_channels = deque()
+        self._sequence = itertools.count()
+
+    def __enter__(self):
+        super().__enter__()
+        self.allocated_channels = self.sound_channels
+
+    def __exit__(self, *exc):
+        logger.info("Sound channels: %s, %d in use", self.stats, len(self.voices))
+        super().__exit__(*exc)
+
+    def _on_channel_finished(self, channel_num):
+        # "NEVER call SDL_Mixer functions, nor SDL_LockAudio, from a callback function."
+        self._finished_channels.append(channel_num)
+        super()._on_channel_finished(channel_num)
+
+    def release_finished(self):
+        """
+        Free the channels of sounds that have finished.
+        """
+        finished = self._finished_channels
+        while finished:
+            channel = finished.popleft()
+            # A stolen channel reports finishing after its new sound started.
+            if not mix_call(Mix_Playing, channel):
+                self.voices.pop(channel, None)
+
+    def find_channel(self, priority: int):
+        for channel in range(self.sound_channels):
+            if channel not in self.voices:
+                return channel
+
+        candidates = [
+            (voice.priority, voice.started, channel)
+            for channel, voice in self.voices.items()
+            if voice.priority < priority
+        ]
+        if not candidates:
+            return None
+        _, _, victim = min(candidates)
+        mix_call(Mix_HaltChannel, victim)
+        del self.voices[victim]
+        self.stats.stolen += 1
+        return victim
+
+    def on_play_sound(self, event, signal):
+        sound = event.sound
+        if not sound.is_loaded():
+            prefetch = getattr(sound, "prefetch", None)
+            if prefetch is not None:
+                prefetch()
+            self.stats.not_loaded += 1
+            return
+
+        self.release_finished()
+        voices = getattr(sound, "voices", None)
+        if voices is not None and sum(voice.sound is sound for voice in self.voices.values()) >= voices:
+            self.stats.over_voice_limit += 1
+            return
+
+        priority = getattr(sound, "priority", 0)
+        channel = self.find_channel(priority)
+        if channel is None:
+            self.stats.no_channel += 1
+            return
+
+        mix_call(Mix_PlayChannel, channel, sound.load(), 0, _check_error=lambda rv: rv == -1)
+        self.voices[channel] = Voice(sound, priority, next(self._sequence))
+        self._currently_playing[channel] = sound
+        self.stats.played += 1
+        self.stats.peak_channels = max(self.stats.peak_channels, len(self.voices))
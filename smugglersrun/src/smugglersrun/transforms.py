@@ -0,0 +1,79 @@
+from dataclasses import dataclass
+from math import cos, radians, sin
+from typing import Dict, List, Tuple
+
+import ppb
+
+
+@dataclass
+class Link:
+    child: ppb.Sprite
+    x: float
+    y: float
+    rotation: float
+    inherit_rotation: bool
+
+
+class TransformTree:
+    """
+    Sprites placed relative to a parent sprite.
+
+    A child is declared with an offset and rotation in its parent's frame:
+    +y is the way the parent faces and +x is to its right when the parent
+    is unrotated. Children that don't inherit rotation keep their offset in
+    world space and their own rotation.
+
+    :meth:`update` places every child in one pass, but skips a parent's
+    children when the parent hasn't moved or turned since they were last
+    placed. Add the tree to a scene to have it update on PreRender.
+    """
+
+    def __init__(self):
+        self.children: Dict[ppb.Sprite, List[Link]] = {}
+        self.parents: Dict[ppb.Sprite, ppb.Sprite] = {}
+        self.placed: Dict[ppb.Sprite, Tuple[ppb.Vector, float]] = {}
+
+    def attach(self, child: ppb.Sprite, parent: ppb.Sprite, offset=(0, 0), *,
+               rotation: float = 0, inherit_rotation: bool = True):
+        self.detach(child)
+        x, y = offset
+        self.children.setdefault(parent, []).append(Link(child, x, y, rotation, inherit_rotation))
+        self.parents[child] = parent
+        self.placed.pop(parent, None)
+
+    def detach(self, child: ppb.Sprite):
+        parent = self.parents.pop(child, None)
+        if parent is None:
+            return
+        links = [link for link in self.children[parent] if link.child is not child]
+        if links:
+            self.children[parent] = links
+        else:
+            del self.children[parent]
+            self.placed.pop(parent, None)
+
+    def update(self):
+        placed = self.placed
+        for parent, links in self.children.items():
+            position = parent.position
+            rotation = parent.rotation
+            if placed.get(parent) == (position, rotation):
+                continue
+            placed[parent] = position, rotation
+
+            angle = radians(rotation)
+            c = cos(angle)
+            s = sin(angle)
+            px, py = position
+            for link in links:
+                if link.inherit_rotation:
+                    x = link.x * c - link.y * s
+                    y = link.x * s + link.y * c
+                    link.child.rotation = rotation + link.rotation
+                else:
+                    x = link.x
+                    y = link.y
+                link.child.position = ppb.Vector(px + x, py + y)
+
+    def on_pre_render(self, event, signal):
+        self.update()
@@ -0,0 +1,234 @@
+"""
+Invariants of the simulation's core data paths.
+
+Run from the smugglersrun directory with ``python -m pytest``.
+"""
+import random
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import ppb
+import pytest
+
+from smugglersrun.batch import ColumnWriter, bounded_map, write_rows
+from smugglersrun.perlin import PerlinNoiseFactory
+from smugglersrun.replay import Frame, Header, Recording, RecordingWriter, unpack_controls
+from smugglersrun.sandbox import Components, MineField
+from smugglersrun.systems import CONTROL_NAMES, Controls, FixedUpdater, Profiler
+from smugglersrun.utils import box_collide
+
+
+@pytest.mark.parametrize("dimension", [1, 2, 3])
+@pytest.mark.parametrize("octaves", [1, 3])
+@pytest.mark.parametrize("cache_size", [4, 1024])
+def test_batch_noise_equals_scalar(dimension, octaves, cache_size):
+    points = np.random.default_rng(dimension).uniform(-20, 20, size=(200, dimension))
+    factory = PerlinNoiseFactory(dimension, octaves=octaves, seed=7, cache_size=cache_size)
+
+    batch = factory.batch(points)
+    scalar = [factory(*point) for point in points.tolist()]
+
+    assert batch.tolist() == scalar
+    if cache_size == 4:
+        assert factory.evictions > 0
+
+
+def test_batch_noise_far_apart_points():
+    points = [[0.5] * 3, [1e7 + 0.5] * 3, [0.5] * 3]
+    factory = PerlinNoiseFactory(3, seed=1)
+
+    assert factory.batch(points).tolist() == [factory(*point) for point in points]
+
+
+@pytest.mark.parametrize("cache_size", [4, 1024])
+def test_gradient_memory_matches_cache(cache_size):
+    factory = PerlinNoiseFactory(2, seed=7, cache_size=cache_size)
+    factory.batch(np.random.default_rng(0).uniform(-20, 20, size=(200, 2)))
+    expected = sys.getsizeof(factory.gradient) + sum(
+        sys.getsizeof(grid_point) + sys.getsizeof(gradient)
+        + sum(sys.getsizeof(coord) for coord in grid_point + gradient)
+        for grid_point, gradient in factory.gradient.items()
+    )
+    assert factory.gradient_memory() == expected
+
+
+def _control_active(factory, damage, control_val, now):
+    # Player.control_active from before Components, with its Component's randomizer.
+    _random = (factory(now / 5) + 1) / 2
+    malfunction = _random < damage / Components.CONFIG_MAX_DAMAGE
+    return (control_val and not malfunction) or (not control_val and malfunction)
+
+
+@pytest.mark.parametrize("damage", [0, 25, 75, (0, 10, 40, 60, 90, 100)])
+@pytest.mark.parametrize("chance", [0.0, 0.05, 0.5])
+def test_components_match_per_component_rules(damage, chance):
+    noise = [PerlinNoiseFactory(1, seed=seed) for seed in range(len(CONTROL_NAMES))]
+    inputs = random.Random(1)
+    frames = [
+        (12.5 + frame * 0.016, Controls(*(inputs.random() < 0.5 for _ in CONTROL_NAMES)))
+        for frame in range(1000)
+    ]
+
+    random.seed(5)
+    expected = []
+    damages = list(np.broadcast_to(damage, len(CONTROL_NAMES)).tolist())
+    for now, controls in frames:
+        for index in range(len(damages)):
+            if random.random() <= chance:
+                damages[index] += 1
+        active = [
+            _control_active(factory, component_damage, getattr(controls, name), now)
+            for factory, component_damage, name in zip(noise, damages, CONTROL_NAMES)
+        ]
+        expected.append((list(damages), active))
+
+    random.seed(5)
+    components = Components(damage, noise=noise)
+    actual = []
+    for now, controls in frames:
+        components.roll(chance)
+        actual.append((components.damage.tolist(), components.resolve(controls, now)))
+
+    assert actual == expected
+
+
+def _recording_frames():
+    rng = np.random.default_rng(0)
+    now = 12.345678
+    for index in range(500):
+        time_delta = 0.016 if index % 50 else float(rng.uniform(0.001, 0.1))
+        # Mostly one step on, as FixedUpdater's clock moves, with some jumps.
+        now += time_delta if index % 7 else float(rng.uniform(0, 0.05))
+        yield Frame(unpack_controls(int(rng.integers(0, 64))), time_delta, now)
+
+
+def _write_recording(path):
+    header = Header(3, 11, 12, 285.0, 60.0, (0, 5, 10, 15, 20, 25), 12.3)
+    frames = list(_recording_frames())
+    writer = RecordingWriter(open(path, "wb"), header)
+    for frame in frames:
+        writer.write(frame.controls, frame.time_delta, frame.now)
+    writer.close()
+    return header, frames
+
+
+def test_recording_round_trip(tmp_path):
+    path = tmp_path / "run.srr"
+    header, frames = _write_recording(path)
+    recording = Recording(path)
+    try:
+        assert recording.header == header
+        assert len(recording) == len(frames)
+        assert list(recording) == frames
+    finally:
+        recording.close()
+
+
+@pytest.mark.parametrize("cut", [1, 100, -1])
+def test_cut_off_recording_is_refused(tmp_path, cut):
+    path = tmp_path / "run.srr"
+    _write_recording(path)
+    path.write_bytes(path.read_bytes()[:cut])
+    with pytest.raises(ValueError):
+        Recording(path)
+
+
+def test_unclosed_recording_is_refused(tmp_path):
+    path = tmp_path / "run.srr"
+    header, frames = _write_recording(path)
+    writer = RecordingWriter(open(path, "wb"), header)
+    for frame in frames:
+        writer.write(frame.controls, frame.time_delta, frame.now)
+    writer.flush()
+    writer.file.close()
+    with pytest.raises(ValueError):
+        Recording(path)
+
+
+@pytest.mark.parametrize("rows", [0, 5, 2500])
+def test_column_writer_files_load(tmp_path, rows):
+    columns = {"run": "<i8", "finish_time": "<f8", "won": "|b1"}
+    writer = ColumnWriter(tmp_path, columns, block=1024)
+    expected = [(run, run * 0.5, run % 3 == 0) for run in range(rows)]
+    for row in expected:
+        writer.append(row)
+    writer.close()
+    for index, (name, dtype) in enumerate(columns.items()):
+        for mmap_mode in (None, "r"):
+            loaded = np.load(tmp_path / f"{name}.npy", mmap_mode=mmap_mode)
+            assert loaded.dtype == np.dtype(dtype)
+            assert loaded.tolist() == [row[index] for row in expected]
+
+
+def _row_or_interrupt(run):
+    if run == 1500:
+        raise KeyboardInterrupt
+    return run, run * 0.5
+
+
+def test_interrupted_batch_keeps_written_rows(tmp_path):
+    columns = {"run": "<i8", "finish_time": "<f8"}
+    writer = ColumnWriter(tmp_path, columns, block=1024)
+    with ThreadPoolExecutor(2) as executor:
+        with pytest.raises(KeyboardInterrupt):
+            write_rows(writer, bounded_map(executor, _row_or_interrupt, range(3000), 8))
+    assert np.load(tmp_path / "run.npy", mmap_mode="r").tolist() == list(range(1500))
+    assert np.load(tmp_path / "finish_time.npy").tolist() == [run * 0.5 for run in range(1500)]
+
+
+def test_bounded_map_keeps_order():
+    with ThreadPoolExecutor(2) as executor:
+        assert list(bounded_map(executor, abs, range(0, -50, -1), 3)) == list(range(50))
+
+
+def test_mine_field_collide_matches_box_collide():
+    rng = np.random.default_rng(3)
+    field = MineField()
+    for chunk in range(3):
+        positions = rng.uniform((-6, chunk * 10), (6, chunk * 10 + 10), (80, 2))
+        field.add_chunk(chunk, [tuple(position) for position in positions.tolist()])
+    field.evict_chunk(1)
+    mines = [ppb.Sprite(position=ppb.Vector(x, y), size=field.size) for x, y in zip(field.x.tolist(), field.y.tolist())]
+
+    positions = rng.uniform((-7, -1), (7, 31), (300, 2)).tolist()
+    # Sprites exactly edge to edge with a mine don't touch.
+    edge = (1 + field.size) / 2
+    positions += [(mine.position.x + edge, mine.position.y) for mine in mines[:20]]
+    hits = 0
+    for x, y in positions:
+        sprite = ppb.Sprite(position=ppb.Vector(x, y), size=1)
+        expected = [index for index, mine in enumerate(mines) if box_collide(sprite, mine)]
+        assert field.collide(sprite).tolist() == expected
+        hits += len(expected)
+    assert hits
+
+
+def test_fixed_updater_clock_skips_dropped_steps():
+    engine = ppb.GameEngine(ppb.BaseScene, basic_systems=[])
+    updater = FixedUpdater(engine=engine, update_rate=50, max_updates=2)
+    updates = []
+    for now in (10.0, 10.05, 10.5, 10.52):  # The jump to 10.5 holds more steps than the cap.
+        idle = ppb.events.Idle(0)
+        idle.now = now
+        updater.on_idle(idle, updates.append)
+
+    assert updater.dropped_updates
+    steps = range(1, len(updates) + 1)
+    assert [update.now for update in updates] == pytest.approx([10 + 0.02 * step for step in steps])
+    assert updater.sim_time + updater.accumulated_time + updater.dropped_updates * updater.time_step == pytest.approx(10.52)
+
+
+def test_profiler_frame_spans_drawn_frames():
+    engine = ppb.GameEngine(ppb.BaseScene, basic_systems=[])
+    profiler = Profiler(engine=engine, profile_overlay=False)
+    for idles in (3, 1, 5, 2):  # ppb loops without drawing between frames.
+        for _ in range(idles):
+            engine.signal(ppb.events.Idle(0))
+            engine.publish()
+        engine.signal(ppb.events.PreRender())
+        engine.publish()
+    engine.signal(ppb.events.Idle(0))
+    engine.publish()
+
+    assert len(profiler.samples["frame"]) == 3
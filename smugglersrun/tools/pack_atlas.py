@@ -0,0 +1,118 @@
+"""
+Pack the sprite images in resources/ into a texture atlas.
+
+Writes atlas.png and the atlas.json region index that smugglersrun.atlas
+loads. Run it from the project root after changing any of the sources:
+
+    python tools/pack_atlas.py
+"""
+import argparse
+import ctypes
+import math
+from pathlib import Path
+from typing import Dict, Tuple
+
+from ppb.systems._sdl_utils import img_call, sdl_call
+from sdl2 import SDL_BLENDMODE_NONE
+from sdl2 import SDL_BlitSurface
+from sdl2 import SDL_ConvertSurfaceFormat
+from sdl2 import SDL_CreateRGBSurfaceWithFormat
+from sdl2 import SDL_FreeSurface
+from sdl2 import SDL_PIXELFORMAT_ARGB8888
+from sdl2 import SDL_Rect
+from sdl2 import SDL_SetSurfaceBlendMode
+from sdl2.sdlimage import IMG_Load
+from sdl2.sdlimage import IMG_SavePNG
+
+RESOURCES = Path(__file__).parent.parent / "src" / "smugglersrun" / "resources"
+
+SOURCES = (
+    "beacon.png",
+    "dev_ship.png",
+    "finish.png",
+    "fire.png",
+    "laserBlue08.png",
+    "laserBlue09.png",
+    "laserBlue10.png",
+    "laserBlue11.png",
+    "shock-mine.png",
+)
+
+Size = Tuple[int, int]
+Region = Tuple[int, int, int, int]
+
+
+def shelf_pack(sizes: Dict[str, Size], *, padding: int) -> Tuple[Size, Dict[str, Region]]:
+    """
+    Place rectangles in rows, tallest first, leaving ``padding`` pixels
+    around each one.
+
+    The atlas width is a power of two, at least the widest image and at
+    least the side of a square holding all of them. Returns the atlas size
+    and each rectangle's (x, y, w, h).
+    """
+    area = sum((w + padding) * (h + padding) for w, h in sizes.values())
+    widest = max(w for w, _ in sizes.values()) + 2 * padding
+    width = 2 ** math.ceil(math.log2(max(widest, math.sqrt(area))))
+
+    regions = {}
+    x = y = padding
+    shelf_height = 0
+    for name, (w, h) in sorted(sizes.items(), key=lambda item: (-item[1][1], item[0])):
+        if x + w + padding > width:
+            x = padding
+            y += shelf_height + padding
+            shelf_height = 0
+        regions[name] = (x, y, w, h)
+        x += w + padding
+        shelf_height = max(shelf_height, h)
+    return (width, y + shelf_height + padding), regions
+
+
+def build(resources: Path, *, padding: int = 2, image: str = "atlas.png", index: str = "atlas.json"):
+    surfaces = {}
+    for name in SOURCES:
+        loaded = img_call(IMG_Load, str(resources / name).encode("utf-8"), _check_error=lambda rv: not rv)
+        surfaces[name] = sdl_call(
+            SDL_ConvertSurfaceFormat, loaded, SDL_PIXELFORMAT_ARGB8888, 0,
+            _check_error=lambda rv: not rv
+        )
+        SDL_FreeSurface(loaded)
+
+    (width, height), regions = shelf_pack(
+        {name: (surface.contents.w, surface.contents.h) for name, surface in surfaces.items()},
+        padding=padding
+    )
+    atlas = sdl_call(
+        SDL_CreateRGBSurfaceWithFormat, 0, width, height, 32, SDL_PIXELFORMAT_ARGB8888,
+        _check_error=lambda rv: not rv
+    )
+    for name, surface in surfaces.items():
+        # Copy the image's alpha instead of blending onto the empty atlas.
+        sdl_call(SDL_SetSurfaceBlendMode, surface, SDL_BLENDMODE_NONE, _check_error=lambda rv: rv < 0)
+        sdl_call(
+            SDL_BlitSurface, surface, None, atlas, ctypes.byref(SDL_Rect(*regions[name])),
+            _check_error=lambda rv: rv < 0
+        )
+        SDL_FreeSurface(surface)
+
+    img_call(IMG_SavePNG, atlas, str(resources / image).encode("utf-8"), _check_error=lambda rv: rv < 0)
+    SDL_FreeSurface(atlas)
+    # One region per line keeps diffs of the index readable.
+    lines = ",\n".join(f'    "{name}": {list(regions[name])}' for name in sorted(regions))
+    with open(resources / index, "w") as index_file:
+        index_file.write(f'{{\n  "image": "{image}",\n  "regions": {{\n{lines}\n  }}\n}}\n')
+    return (width, height), regions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pack the sprite images into a texture atlas.")
+    parser.add_argument("--resources", type=Path, default=RESOURCES)
+    parser.add_argument("--padding", type=int, default=2)
+    args = parser.parse_args(argv)
+    (width, height), regions = build(args.resources, padding=args.padding)
+    print(f"Packed {len(regions)} images into a {width}x{height} atlas.")
+
+
+if __name__ == "__main__":
+    main()